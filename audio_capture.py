@@ -1,13 +1,191 @@
+import threading
+import time
+import wave
 import numpy as np
 import pyaudio
+from spectrum import SpectrumAnalyzer
+from audio_features import AudioFeatureExtractor
+from logger import get_logger
+
+log = get_logger("audio")
+
+
+class RingBuffer:
+    """
+    Buffer melingkar NumPy yang dialokasikan sekali di awal.
+
+    Penulis (callback audio) menimpa data tertua, pembaca mengambil N sampel terbaru
+    tanpa menunggu. Kapasitas tetap sehingga tidak ada alokasi di jalur callback.
+    """
+
+    def __init__(self, capacity, dtype=np.int16):
+        self.capacity = capacity  # Jumlah sampel maksimum yang disimpan
+        self.buffer = np.zeros(capacity, dtype=dtype)  # Penyimpanan sampel
+        self.total_written = 0  # Jumlah seluruh sampel yang pernah ditulis
+        self._lock = threading.Lock()
+
+    def write(self, samples):
+        """
+        Menulis sampel baru ke buffer, menimpa sampel tertua jika penuh.
+        """
+        count = len(samples)
+        if count == 0:
+            return
+        if count > self.capacity:
+            # Hanya sampel terbaru yang muat di buffer
+            samples = samples[-self.capacity:]
+        n = len(samples)
+
+        with self._lock:
+            start = (self.total_written + count - n) % self.capacity
+            end = start + n
+            if end <= self.capacity:
+                self.buffer[start:end] = samples
+            else:
+                split = self.capacity - start
+                self.buffer[start:] = samples[:split]
+                self.buffer[:end - self.capacity] = samples[split:]
+            self.total_written += count
+
+    def read_latest(self, n, out=None, total=None):
+        """
+        Menyalin n sampel terbaru (urut dari terlama ke terbaru) ke array out.
+
+        total: nilai total_written yang sudah dibaca pemanggil; sampel diambil sampai titik itu
+        (bukan sampai tulisan terbaru), sehingga jumlah blok dan isi snapshot selalu sepadan.
+        Jika sampel yang tersedia kurang dari n, bagian awal diisi nol.
+        Mengembalikan (out, total_written) saat snapshot diambil.
+        """
+        n = min(n, self.capacity)
+        if out is None:
+            out = np.zeros(n, dtype=self.buffer.dtype)
+
+        with self._lock:
+            if total is None:
+                total = self.total_written
+            available = min(n, total)
+            out[:n - available] = 0
+            if available:
+                end = total % self.capacity
+                start = end - available
+                if start >= 0:
+                    out[n - available:] = self.buffer[start:end]
+                else:
+                    # Data melewati batas akhir buffer, salin dalam dua bagian
+                    out[n - available:n - end] = self.buffer[start:]
+                    out[n - end:] = self.buffer[:end]
+        return out, total
+
+
+class WavSource:
+    """
+    Sumber audio dari file WAV 16-bit (stereo dicampur menjadi mono).
+    """
+
+    def __init__(self, path, loop=True):
+        self.path = path
+        self.loop = loop  # Ulangi dari awal saat file habis
+        self.wav = wave.open(path, "rb")
+        if self.wav.getsampwidth() != 2:
+            self.wav.close()
+            raise ValueError(f"File WAV '{path}' harus 16-bit PCM.")
+        self.rate = self.wav.getframerate()
+        self.channels = self.wav.getnchannels()
+
+    def read(self, n):
+        """
+        Membaca n sampel mono, atau None jika file habis dan loop dimatikan.
+        """
+        data = self.wav.readframes(n)
+        if len(data) < n * 2 * self.channels and self.loop:
+            self.wav.rewind()
+            data += self.wav.readframes(n - len(data) // (2 * self.channels))
+        if not data:
+            return None
+        samples = np.frombuffer(data, dtype=np.int16)
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1).astype(np.int16)
+        return samples
+
+    def close(self):
+        self.wav.close()
+
+
+class GeneratorSource:
+    """
+    Sumber audio sintetis dari fungsi generator(n, start) yang mengembalikan n sampel.
+    """
+
+    def __init__(self, generator, rate=44100):
+        self.generator = generator  # Fungsi pembangkit sampel
+        self.rate = rate
+        self.position = 0  # Indeks sampel berikutnya
+
+    def read(self, n):
+        samples = self.generator(n, self.position)
+        if samples is None:
+            return None
+        self.position += n
+        return np.asarray(samples, dtype=np.int16)
+
+    def close(self):
+        pass
+
+
+def sine_wave(frequency, rate=44100, amplitude=8000):
+    """
+    Membuat generator gelombang sinus untuk GeneratorSource.
+    """
+    def generate(n, start):
+        t = (np.arange(n) + start) / rate
+        return amplitude * np.sin(2 * np.pi * frequency * t)
+    return generate
+
 
 class AudioCapture:
-    def __init__(self, rate=44100, chunk=1024):
+    def __init__(self, rate=44100, chunk=1024, mode="blocking", source=None, buffer_seconds=2.0, realtime=True,
+                 num_bands=10, max_batch=8, features=True):
         self.rate = rate  # Sampling rate (Hz)
         self.chunk = chunk  # Jumlah frame per buffer
-        self.p = pyaudio.PyAudio()  # Inisialisasi PyAudio
+        self.mode = mode  # "blocking" (stream.read) atau "callback" (stream_callback + ring buffer)
+        self.realtime = realtime  # Sumber file/sintetis diputar sesuai waktu nyata
+        self.max_batch = max_batch  # Jumlah blok maksimum yang dianalisis sekaligus di mode callback
+        self.p = None
         self.stream = None
-        self.device_index = self.find_stereo_mix_device()  # Mencari perangkat Stereo Mix atau menggunakan perangkat default
+        self.source = None
+
+        # Ring buffer dan penghitung untuk mode callback
+        self.ring = None
+        self.overruns = 0  # Sampel hilang karena buffer tertimpa atau perangkat overflow
+        self.underruns = 0  # Pembacaan tanpa sampel baru sejak pembacaan sebelumnya
+        self._last_read_total = 0
+        self._data_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._feeder = None
+        self._snapshot = np.zeros(chunk, dtype=np.int16)  # Buffer snapshot yang dipakai ulang
+
+        if source is None:
+            # Sumber perangkat: Stereo Mix atau input default
+            self.p = pyaudio.PyAudio()  # Inisialisasi PyAudio
+            self.device_index = self.find_stereo_mix_device()  # Mencari perangkat Stereo Mix atau menggunakan perangkat default
+        elif isinstance(source, str):
+            self.source = WavSource(source)  # Sumber file WAV
+            self.rate = self.source.rate
+        elif callable(source):
+            self.source = GeneratorSource(source, rate)  # Sumber sintetis
+        else:
+            self.source = source  # Objek sumber dengan metode read(n) dan atribut rate
+            self.rate = getattr(source, "rate", rate)
+
+        if self.mode == "callback":
+            self.ring = RingBuffer(max(self.chunk * max_batch, int(self.rate * buffer_seconds)))
+
+        # Satu-satunya mesin spektrum, dipakai oleh semua konsumen audio
+        self.analyzer = SpectrumAnalyzer(self.rate, self.chunk, num_bands)
+
+        # Fitur audio per blok (RMS, flux, onset, tempo) dari spektrum yang sama, dibaca lewat latest_features()
+        self.features = AudioFeatureExtractor(self.rate, self.chunk) if features else None
+        self.analyzer.features = self.features
         self.init_audio_stream()  # Menginisialisasi aliran audio
 
     def find_stereo_mix_device(self):
@@ -26,6 +204,13 @@ class AudioCapture:
         """
         Menginisialisasi aliran audio dengan perangkat yang dipilih.
         """
+        if self.source is not None:
+            # Sumber file/sintetis: di mode callback diumpankan oleh thread terpisah
+            if self.mode == "callback":
+                self._feeder = threading.Thread(target=self._feed_source, name="audio-feeder", daemon=True)
+                self._feeder.start()
+            return
+
         try:
             self.stream = self.p.open(
                 format=pyaudio.paInt16,  # Format audio 16-bit
@@ -33,40 +218,138 @@ class AudioCapture:
                 rate=self.rate,  # Sampling rate
                 input=True,  # Mode input (menerima audio)
                 frames_per_buffer=self.chunk,  # Jumlah frame per buffer
-                input_device_index=self.device_index  # Indeks perangkat input
+                input_device_index=self.device_index,  # Indeks perangkat input
+                stream_callback=self._stream_callback if self.mode == "callback" else None
             )
             print("Aliran audio berhasil dibuka.")
         except Exception as e:
             print(f"Gagal menginisialisasi aliran audio: {e}")
             self.stream = None
 
+    def _stream_callback(self, in_data, frame_count, time_info, status):
+        # Dipanggil oleh PortAudio di thread-nya sendiri: cukup salin ke ring buffer
+        if status & pyaudio.paInputOverflow:
+            self.overruns += 1
+        self._on_samples(np.frombuffer(in_data, dtype=np.int16))
+        return None, pyaudio.paContinue
+
+    def _feed_source(self):
+        # Mengumpankan sumber file/sintetis ke ring buffer per chunk
+        period = self.chunk / self.rate
+        deadline = time.perf_counter()
+        while not self._stop_event.is_set():
+            samples = self.source.read(self.chunk)
+            if samples is None:
+                break
+            self._on_samples(samples)
+            if self.realtime:
+                deadline += period
+                delay = deadline - time.perf_counter()
+                if delay > 0:
+                    self._stop_event.wait(delay)
+
+    def _on_samples(self, samples):
+        self.ring.write(samples)
+        self._data_event.set()
+
+    def wait_for_data(self, timeout=None):
+        """
+        Menunggu blok audio baru (mode callback). Di mode blocking langsung kembali True.
+        """
+        if self.mode != "callback":
+            return True
+        ready = self._data_event.wait(timeout)
+        self._data_event.clear()
+        return ready
+
+    def get_samples(self, n=None, total=None):
+        """
+        Mengambil n sampel terbaru dari ring buffer tanpa memblokir (mode callback).
+
+        total: snapshot total_written yang menjadi akhir sampel (None = tulisan terbaru).
+        """
+        n = n or self.chunk
+        out = self._snapshot if n == len(self._snapshot) else None
+        samples, total = self.ring.read_latest(n, out, total)
+
+        # Perbarui penghitung overrun/underrun berdasarkan sampel baru sejak pembacaan terakhir
+        new_samples = total - self._last_read_total
+        if new_samples == 0:
+            self.underruns += 1
+        elif new_samples > self.ring.capacity:
+            self.overruns += 1
+        self._last_read_total = total
+        return samples
+
     def get_audio_data(self):
         """
         Menangkap data audio secara real-time dari desktop.
-        
-        Menggunakan FFT (Fast Fourier Transform) untuk mendapatkan spektrum frekuensi.
+
+        Mengembalikan energi band (0-1) dari SpectrumAnalyzer. Di mode callback, semua
+        blok baru sejak pembacaan terakhir dianalisis sekaligus dari snapshot ring buffer
+        tanpa memblokir, sehingga smoothing tetap mengikuti laju audio.
         """
         try:
-            if self.stream is None:
-                print("Aliran audio tidak tersedia.")
-                return None
+            if self.mode == "callback":
+                # Satu snapshot total_written untuk jumlah blok dan sampelnya: blok yang ditulis
+                # callback di antara keduanya menunggu pembacaan berikutnya, tidak terlewat
+                total = self.ring.total_written
+                if total == 0:
+                    return None
+                new_blocks = (total - self._last_read_total) // self.chunk
+                batch = max(1, min(new_blocks, self.max_batch))
+                samples = self.get_samples(batch * self.chunk, total)
+                return self.analyzer.analyze_batch(samples.reshape(batch, self.chunk), total)[-1]
+            elif self.source is not None:
+                audio_data = self.source.read(self.chunk)
+                if audio_data is None:
+                    return None
+            else:
+                if self.stream is None:
+                    log.warning("Aliran audio tidak tersedia.", rate_limit=5.0)
+                    return None
 
-            # Membaca data audio dari aliran
-            data = self.stream.read(self.chunk, exception_on_overflow=False)
-            audio_data = np.frombuffer(data, dtype=np.int16)  # Mengonversi byte menjadi integer 16-bit
+                # Membaca data audio dari aliran
+                data = self.stream.read(self.chunk, exception_on_overflow=False)
+                audio_data = np.frombuffer(data, dtype=np.int16)  # Mengonversi byte menjadi integer 16-bit
 
-            # Menghitung FFT untuk mendapatkan spektrum frekuensi
-            fft_data = np.abs(np.fft.fft(audio_data))[:self.chunk // 2]  # Hanya mengambil setengah spektrum (frekuensi positif)
-            return fft_data
+            # Menghitung energi band dengan rfft berjendela
+            return self.analyzer.analyze(audio_data)
         except Exception as e:
-            print(f"Gagal menangkap audio: {e}")
+            log.error("Gagal menangkap audio: {error}", rate_limit=1.0, error=e)
             return None
 
+    def latest_features(self):
+        """
+        Fitur audio terbaru (AudioFeatures) tanpa kunci, atau None jika ekstraksi fitur dimatikan.
+
+        Diperbarui per blok audio oleh get_audio_data(), tidak bergantung pada laju video.
+        """
+        return self.features.latest if self.features is not None else None
+
+    def stats(self):
+        """
+        Mengembalikan penghitung ring buffer untuk pemantauan.
+        """
+        return {
+            "overruns": self.overruns,
+            "underruns": self.underruns,
+            "samples_written": self.ring.total_written if self.ring is not None else 0,
+            **self.analyzer.stats(),
+            **(self.features.stats() if self.features is not None else {}),
+        }
+
     def close(self):
         """
         Menutup aliran audio.
         """
+        self._stop_event.set()
+        if self._feeder is not None:
+            self._feeder.join(1.0)
         if self.stream:
             self.stream.stop_stream()  # Menghentikan aliran
             self.stream.close()  # Menutup aliran
-        self.p.terminate()  # Menghentikan PyAudio
+        if self.source is not None:
+            self.source.close()
+        if self.p is not None:
+            self.p.terminate()  # Menghentikan PyAudio
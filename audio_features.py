@@ -0,0 +1,180 @@
+import collections
+import math
+import time
+import numpy as np
+
+# Satu snapshot fitur audio; diganti utuh setiap blok sehingga pembaca tidak butuh kunci
+AudioFeatures = collections.namedtuple("AudioFeatures", [
+    "t",  # Waktu stream (detik) di akhir blok
+    "rms",  # RMS blok, 0-1 terhadap skala penuh int16
+    "flux",  # Spectral flux (kenaikan log-magnitudo rata-rata per bin)
+    "onset",  # True jika onset terdeteksi di blok ini
+    "onset_strength",  # Seberapa jauh flux di atas ambang adaptif (0 = di bawah ambang)
+    "onsets",  # Jumlah onset sejak awal (untuk mendeteksi onset yang terlewat di antara pembacaan)
+    "last_onset_t",  # Waktu stream onset terakhir (detik)
+    "tempo",  # Perkiraan tempo (BPM), 0 jika belum cukup onset
+    "tempo_confidence",  # 0-1, porsi histogram IOI di puncak tempo
+    "beat_phase",  # Fase ketukan 0-1 sejak onset terakhir menurut tempo
+])
+
+
+class AudioFeatureExtractor:
+    """
+    Ekstraksi fitur audio inkremental per blok: RMS, spectral flux, onset, dan tempo.
+
+    Memakai spektrum daya yang sudah dihitung SpectrumAnalyzer (tanpa FFT tambahan). Semua
+    state berukuran tetap: spektrum blok sebelumnya, rata-rata/deviasi flux eksponensial,
+    cincin waktu onset terakhir, dan histogram interval antar-onset (IOI) yang meluruh,
+    sehingga kerja per blok konstan berapa pun panjang stream.
+
+    Hasil terbaru dibaca lewat atribut latest (AudioFeatures), yang diganti utuh setiap
+    blok; membaca satu atribut atomik di CPython sehingga pembaca dari thread lain tidak
+    perlu kunci.
+    """
+
+    def __init__(self, rate=44100, chunk=1024, threshold=3.0, floor=0.005, refractory=0.1, adapt_seconds=1.0,
+                 min_bpm=80.0, max_bpm=160.0, tempo_memory=8.0, history=8):
+        self.rate = rate  # Sampling rate (Hz)
+        self.chunk = chunk  # Jumlah sampel per blok
+        self.threshold = threshold  # Onset jika flux > rata-rata + threshold * deviasi
+        self.floor = floor  # Flux minimum untuk onset (menahan onset palsu saat hening)
+        self.refractory = refractory  # Jarak minimum antar onset (detik)
+        self.min_bpm = min_bpm  # Tempo dilipat (x2 / /2) ke rentang satu oktaf [min_bpm, max_bpm)
+        self.max_bpm = max_bpm
+        self.tempo_memory = tempo_memory  # Konstanta waktu peluruhan histogram IOI (detik)
+
+        self.block_seconds = chunk / rate
+        self._alpha = 1.0 - math.exp(-self.block_seconds / adapt_seconds)  # Laju adaptasi ambang
+
+        # Skala penuh spektrum magnitudo: sinus amplitudo 32767 setelah jendela Hann
+        self._mag_ref = 32767.0 * np.hanning(chunk).sum() / 2.0
+        bins = chunk // 2 + 1
+        self._log_mag = np.zeros(bins, dtype=np.float32)
+        self._prev_log_mag = np.zeros(bins, dtype=np.float32)
+        self._diff = np.zeros(bins, dtype=np.float32)
+        self._has_prev = False
+
+        # State ambang adaptif
+        self._flux_mean = 0.0
+        self._flux_dev = 0.0
+        self._above = False  # Flux blok sebelumnya sudah di atas ambang (onset hanya di tepi naik)
+
+        # Cincin waktu onset terakhir dan histogram tempo (resolusi 1 BPM)
+        self._onset_times = np.full(history, -np.inf)
+        self._onset_index = 0
+        self._bpm_bins = np.arange(min_bpm, max_bpm)
+        self._histogram = np.zeros(len(self._bpm_bins))
+        self._histogram_t = 0.0  # Waktu stream saat histogram terakhir diluruhkan
+
+        self.blocks = 0  # Jumlah blok yang diproses
+        self.total_cpu_ms = 0.0
+        self.latest = AudioFeatures(0.0, 0.0, 0.0, False, 0.0, 0, 0.0, 0.0, 0.0, 0.0)
+
+    def process_batch(self, blocks, power, end_sample=None):
+        """
+        Memproses blok berurutan (k x chunk sampel, k x bin spektrum daya) dan mengembalikan fitur terakhir.
+
+        end_sample adalah jumlah sampel stream di akhir blok terakhir; jika None, waktu dihitung
+        dari jumlah blok yang sudah diproses (blok yang terlewat tidak ikut terhitung).
+        """
+        start = time.thread_time()
+        count = len(blocks)
+        rms = np.sqrt(np.mean(np.square(blocks, dtype=np.float32), axis=1)) / 32768.0
+        for i in range(count):
+            if end_sample is None:
+                t = (self.blocks + 1) * self.block_seconds
+            else:
+                t = (end_sample - (count - 1 - i) * self.chunk) / self.rate
+            self.latest = self._process(t, float(rms[i]), power[i])
+        self.total_cpu_ms += (time.thread_time() - start) * 1000.0
+        return self.latest
+
+    def _process(self, t, rms, power):
+        self.blocks += 1
+
+        # Spectral flux: kenaikan log-magnitudo (disearahkan setengah gelombang) dibanding blok sebelumnya
+        np.sqrt(power, out=self._log_mag)
+        self._log_mag *= 1000.0 / self._mag_ref
+        np.log1p(self._log_mag, out=self._log_mag)
+        if self._has_prev:
+            np.subtract(self._log_mag, self._prev_log_mag, out=self._diff)
+            np.maximum(self._diff, 0.0, out=self._diff)
+            flux = float(self._diff.mean())
+        else:
+            flux = 0.0
+        self._log_mag, self._prev_log_mag = self._prev_log_mag, self._log_mag
+        self._has_prev = True
+
+        # Ambang adaptif dari rata-rata dan deviasi absolut flux (eksponensial, O(1))
+        threshold = max(self._flux_mean + self.threshold * self._flux_dev, self.floor)
+        strength = max(0.0, (flux - threshold) / max(self._flux_dev, 1e-6))
+        above = flux > threshold
+        last = self._onset_times[(self._onset_index - 1) % len(self._onset_times)]
+        onset = above and not self._above and t - last >= self.refractory
+        self._above = above
+        self._flux_dev += self._alpha * (abs(flux - self._flux_mean) - self._flux_dev)
+        self._flux_mean += self._alpha * (flux - self._flux_mean)
+
+        previous = self.latest
+        onsets, last_onset_t = previous.onsets, previous.last_onset_t
+        tempo, confidence = previous.tempo, previous.tempo_confidence
+        if onset:
+            # Histogram tempo hanya berubah saat ada onset
+            self._add_onset(t)
+            tempo, confidence = self._tempo()
+            onsets += 1
+            last_onset_t = t
+
+        phase = ((t - last_onset_t) * tempo / 60.0) % 1.0 if tempo and onsets else 0.0
+        return AudioFeatures(t, rms, flux, onset, strength, onsets, last_onset_t, tempo, confidence, phase)
+
+    def _add_onset(self, t):
+        # Luruhkan histogram sesuai waktu sejak pembaruan terakhir
+        self._histogram *= math.exp(-(t - self._histogram_t) / self.tempo_memory)
+        self._histogram_t = t
+
+        # IOI ke beberapa onset terakhir, dilipat ke satu oktaf tempo; onset yang lebih dekat berbobot lebih
+        size = len(self._onset_times)
+        for k in range(1, size + 1):
+            interval = t - self._onset_times[(self._onset_index - k) % size]
+            if not 0.0 < interval < 4.0:
+                continue
+            bpm = 60.0 / interval
+            while bpm < self.min_bpm:
+                bpm *= 2.0
+            while bpm >= self.max_bpm:
+                bpm /= 2.0
+            # Bobot dibagi ke dua bin terdekat (interpolasi linier)
+            position = bpm - self.min_bpm
+            low = int(position)
+            fraction = position - low
+            weight = 1.0 / k
+            self._histogram[low] += weight * (1.0 - fraction)
+            if low + 1 < len(self._histogram):
+                self._histogram[low + 1] += weight * fraction
+
+        self._onset_times[self._onset_index] = t
+        self._onset_index = (self._onset_index + 1) % size
+
+    def _tempo(self):
+        total = self._histogram.sum()
+        if total <= 0.0:
+            return 0.0, 0.0
+        peak = int(self._histogram.argmax())
+        # Penghalusan puncak parabola dengan dua tetangga
+        offset = 0.0
+        if 0 < peak < len(self._histogram) - 1:
+            left, center, right = self._histogram[peak - 1:peak + 2]
+            denominator = left - 2.0 * center + right
+            if denominator < 0.0:
+                offset = 0.5 * (left - right) / denominator
+        mass = self._histogram[max(0, peak - 1):peak + 2].sum()
+        return float(self._bpm_bins[peak] + offset), float(mass / total)
+
+    def stats(self):
+        return {
+            "feature_blocks": self.blocks,
+            "avg_feature_cpu_us_per_block": self.total_cpu_ms * 1000.0 / self.blocks if self.blocks else 0.0,
+            "onsets": self.latest.onsets,
+            "tempo": self.latest.tempo,
+        }
@@ -0,0 +1,702 @@
+import argparse
+import json
+import os
+import sys
+import time
+import wave
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+from text_renderer import TextRenderer
+from midi_control import MemoryOutput, MidiController
+from instrumentation import Instrumentation
+from hand_state import HandState
+from landmark_filter import FILTER_NAMES
+
+FONT_PATH = "Poppins-Regular.ttf"  # Font yang sama dengan Visualizer
+FONT_SIZE = 18
+RESOLUTIONS = {"720p": (1280, 720), "1080p": (1920, 1080)}
+FIXTURE_DIR = "bench_fixtures"  # Lokasi fixture video/audio yang dibuat otomatis
+
+
+def legacy_draw_text(frame, text, position, font_size=FONT_SIZE, color=(255, 255, 255)):
+    """
+    Implementasi lama draw_text_with_poppins: muat font dan konversi seluruh frame setiap label.
+    """
+    img_pil = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    draw = ImageDraw.Draw(img_pil)
+    try:
+        font = ImageFont.truetype(FONT_PATH, font_size)
+    except IOError:
+        font = ImageFont.load_default()
+    draw.text(position, text, font=font, fill=color)
+    frame[:] = cv2.cvtColor(np.array(img_pil), cv2.COLOR_RGB2BGR)
+
+
+def time_per_frame(draw_frame, frames):
+    """
+    Mengukur rata-rata waktu (ms) untuk memanggil draw_frame(i) sebanyak frames kali.
+    """
+    start = time.perf_counter()
+    for i in range(frames):
+        draw_frame(i)
+    return (time.perf_counter() - start) * 1000.0 / frames
+
+
+def bench_text(frames=200):
+    """
+    Membandingkan biaya teks per frame (dua label, seperti dua tangan) sebelum dan sesudah cache sprite.
+    """
+    renderer = TextRenderer(FONT_PATH)
+    results = {}
+    for name, (width, height) in RESOLUTIONS.items():
+        frame = np.zeros((height, width, 3), dtype=np.uint8)
+        positions = [(width // 3, height // 2), (2 * width // 3, height // 2)]
+
+        def labels(i):
+            # Nilai berubah-ubah seperti CC sungguhan, sehingga cache juga diuji saat miss
+            return [f"Vol: {i % 128}", f"Filter: {(i * 7) % 128}"]
+
+        def draw_legacy(i):
+            for text, position in zip(labels(i), positions):
+                legacy_draw_text(frame, text, position)
+
+        def draw_cached(i):
+            for text, position in zip(labels(i), positions):
+                renderer.draw(frame, text, position, font_size=FONT_SIZE)
+
+        before = time_per_frame(draw_legacy, frames)
+        after = time_per_frame(draw_cached, frames)
+        results[name] = (before, after)
+        print(f"{name}: sebelum {before:.3f} ms/frame, sesudah {after:.3f} ms/frame ({before / after:.1f}x)")
+    print(f"Cache sprite: {renderer.hits} hit, {renderer.misses} miss")
+    return results
+
+
+def synthetic_hand(level, x_offset, handedness, frame_size=(640, 480)):
+    """
+    Membuat data satu tangan sintetis: telapak 100 piksel, jarak ibu jari-telunjuk mengikuti level 0-127.
+    """
+    landmarks = np.zeros((21, 2), dtype=np.int32)
+    landmarks[:] = (x_offset, 300)  # Pergelangan dan titik lain di posisi yang sama
+    landmarks[9] = (x_offset, 200)  # Pangkal jari tengah
+    landmarks[4] = (x_offset, 150)  # Ujung ibu jari
+    landmarks[8] = (x_offset + int(10 + 90 * level / 127), 150)  # Ujung telunjuk
+    return {"thumb": tuple(landmarks[4]), "index": tuple(landmarks[8]), "wrist": tuple(landmarks[0]),
+            "landmarks": landmarks, "handedness": handedness, "frame_size": frame_size}
+
+
+def bench_midi(frames=3000, fps=60.0, max_rate_hz=100.0):
+    """
+    Mengirim lonjakan data tangan berderau (tanpa jeda antar frame) ke port memori
+    dan melaporkan jumlah pesan CC serta latensinya.
+    """
+    rng = np.random.default_rng(0)
+    outport = MemoryOutput()
+    controller = MidiController(outport=outport, max_rate_hz=max_rate_hz)
+
+    # Gerakan lambat ditambah jitter, mirip jarak jari dari kamera
+    t = np.arange(frames) / fps
+    volume = np.clip(64 + 50 * np.sin(t) + rng.normal(0, 1.5, frames), 0, 127)
+    eq = np.clip(64 + 50 * np.cos(0.5 * t) + rng.normal(0, 1.5, frames), 0, 127)
+
+    frames_data = [HandState.from_dicts([synthetic_hand(v, 400, "right"), synthetic_hand(e, 200, "left")])
+                   for v, e in zip(volume, eq)]
+
+    start = time.perf_counter()
+    for hands_data in frames_data:
+        controller.send_midi_signals(hands_data)
+    call_ms = (time.perf_counter() - start) * 1000.0 / frames
+    controller.engine.flush()
+
+    stats = controller.engine.stats()
+    controller.close()
+    print(f"{frames} frame -> {stats['sent']} pesan CC (sebelumnya {frames * 3})")
+    print(f"send_midi_signals: {call_ms * 1000.0:.1f} us/panggilan, latensi rata-rata {stats['avg_latency_ms']:.2f} ms, "
+          f"maks {stats['max_latency_ms']:.2f} ms")
+    print(f"Digabung: {stats['coalesced']}, dalam deadband: {stats['suppressed']}, dibuang: {stats['dropped']}")
+    return stats
+
+
+def bench_mapping(frames=2000, counts=(3, 12, 48)):
+    """
+    Biaya evaluasi GestureMapper per frame untuk jumlah pemetaan yang berbeda.
+    """
+    from gesture_mapping import DEFAULT_MAPPINGS, LANDMARK_NAMES, GestureMapper
+
+    rng = np.random.default_rng(0)
+    # Dibangun sebagai HandState seperti keluaran HandTracker
+    hands = [HandState.from_dicts([synthetic_hand(v, 400, "right"), synthetic_hand(127 - v, 200, "left")])
+             for v in rng.integers(0, 128, frames)]
+    features = ["distance", "angle", "height", "x", "pinch"]
+    results = {}
+    for count in counts:
+        mappings = list(DEFAULT_MAPPINGS)
+        while len(mappings) < count:
+            i = len(mappings)
+            feature = features[i % len(features)]
+            points = {"distance": 2, "angle": 3, "height": 1, "x": 1, "pinch": 2}[feature]
+            mappings.append({"feature": feature, "hand": ("left", "right")[i % 2], "cc": 30 + i,
+                             "points": [LANDMARK_NAMES[(i + k * 4) % 21] for k in range(points)]})
+        mapper = GestureMapper(mappings)
+        start = time.perf_counter()
+        for hands_data in hands:
+            mapper.evaluate(hands_data)
+        results[count] = (time.perf_counter() - start) * 1e6 / frames
+        print(f"{count} pemetaan: {results[count]:.1f} us/frame")
+    return results
+
+
+def bench_logging(frames=20000):
+    """
+    Biaya per panggilan: print sinkron dibanding AsyncLogger (lolos, ditahan batas laju, di bawah level).
+    """
+    import logger
+
+    # print ke stdout asli (konsol/terminal), seperti kode lama di jalur panas
+    start = time.perf_counter()
+    for i in range(frames):
+        print(f"Nilai Speed: {i}")
+    print_us = (time.perf_counter() - start) * 1e6 / frames
+
+    results = {"print": print_us}
+    cases = [("lolos", logger.INFO, None), ("dibatasi laju", logger.INFO, 0.5), ("di bawah level", logger.WARNING, None)]
+    for label, level, rate_limit in cases:
+        root = logger.configure(level=level, console=False, capacity=frames)
+        log = logger.get_logger("bench")
+        start = time.perf_counter()
+        for i in range(frames):
+            log.info("Nilai speed: {speed}", rate_limit=rate_limit, speed=i)
+        results[label] = (time.perf_counter() - start) * 1e6 / frames
+        root.close()
+    logger.configure()
+
+    for label, us in results.items():
+        print(f"{label:<16} {us:6.2f} us/panggilan", file=sys.stderr)
+    return results
+
+
+def legacy_draw_spectrum(frame, x_center, y_center, total_width, audio_data, max_height, color=(255, 255, 255), bar_width=2):
+    """
+    Implementasi lama draw_responsive_spectrum: normalisasi np.max dan dua cv2.line per bar.
+    """
+    x_start = x_center - total_width // 2
+    normalized_audio = audio_data / np.max(audio_data) if np.max(audio_data) > 0 else np.zeros_like(audio_data)
+    for i in range(len(audio_data)):
+        x_bar = x_start + i * (total_width // len(audio_data))
+        bar_height = int(normalized_audio[i] * max_height)
+        y_top_up = max(0, y_center - bar_height)
+        y_bottom_down = min(frame.shape[0], y_center + bar_height)
+        cv2.line(frame, (int(x_bar), int(y_center)), (int(x_bar), int(y_top_up)), color, thickness=bar_width, lineType=cv2.LINE_AA)
+        cv2.line(frame, (int(x_bar), int(y_center)), (int(x_bar), int(y_bottom_down)), color, thickness=bar_width, lineType=cv2.LINE_AA)
+
+
+def bench_overlay(frames=200, bar_counts=(10, 100, 400)):
+    """
+    Membandingkan biaya spektrum per frame: loop cv2.line lama vs overlay batch, untuk beberapa jumlah bar.
+    """
+    from overlay import OverlayRenderer
+
+    width, height = RESOLUTIONS["720p"]
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    renderer = OverlayRenderer()
+    rng = np.random.default_rng(0)
+    results = {}
+    for num_bars in bar_counts:
+        spectra = rng.random((frames, num_bars))
+
+        def draw_legacy(i):
+            legacy_draw_spectrum(frame, width // 2, height // 2, 800, spectra[i], 40)
+
+        def draw_batched(i):
+            renderer.begin(frame)
+            heights = (spectra[i] * 40).astype(np.int32)
+            renderer.add_spectrum(width // 2 - 400, 800, height // 2, heights, (255, 255, 255), 2, height)
+            renderer.composite(frame)
+
+        before = time_per_frame(draw_legacy, frames)
+        after = time_per_frame(draw_batched, frames)
+        results[num_bars] = (before, after)
+        print(f"{num_bars} bar: sebelum {before:.3f} ms/frame, sesudah {after:.3f} ms/frame")
+    return results
+
+
+def bench_audio_features(wav_path=None, chunk=1024):
+    """
+    Biaya ekstraksi fitur audio per blok dan hasil onset/tempo pada file WAV (default: fixture 120 BPM).
+    """
+    from spectrum import SpectrumAnalyzer
+    from audio_features import AudioFeatureExtractor
+
+    wav_path = wav_path or fixture_paths()[1]
+    with wave.open(wav_path, "rb") as wav:
+        rate = wav.getframerate()
+        samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+        if wav.getnchannels() == 2:
+            samples = samples.reshape(-1, 2).mean(axis=1).astype(np.int16)
+    blocks = samples[:len(samples) // chunk * chunk].reshape(-1, chunk)
+
+    # Spektrum saja, lalu spektrum + fitur (blok diproses satu per satu seperti di stream)
+    analyzer = SpectrumAnalyzer(rate, chunk)
+    start = time.perf_counter()
+    for block in blocks:
+        analyzer.analyze_batch(block[np.newaxis])
+    spectrum_us = (time.perf_counter() - start) * 1e6 / len(blocks)
+
+    analyzer = SpectrumAnalyzer(rate, chunk)
+    analyzer.features = extractor = AudioFeatureExtractor(rate, chunk)
+    start = time.perf_counter()
+    for i, block in enumerate(blocks):
+        analyzer.analyze_batch(block[np.newaxis], (i + 1) * chunk)
+    features_us = (time.perf_counter() - start) * 1e6 / len(blocks)
+
+    features = extractor.latest
+    seconds = len(blocks) * chunk / rate
+    print(f"{len(blocks)} blok ({seconds:.1f} s, {rate / chunk:.1f} blok/s)")
+    print(f"Spektrum: {spectrum_us:.1f} us/blok, spektrum + fitur: {features_us:.1f} us/blok "
+          f"(fitur {features_us - spectrum_us:.1f} us)")
+    print(f"Onset: {features.onsets} ({features.onsets / seconds:.2f}/s), tempo {features.tempo:.1f} BPM "
+          f"(keyakinan {features.tempo_confidence:.2f})")
+    return {"spectrum_us": spectrum_us, "features_us": features_us, "onsets": features.onsets,
+            "tempo": features.tempo}
+
+
+def bench_quality(frames=200):
+    """
+    Biaya draw_visuals per level kualitas QualityGovernor (level gambar saja; level tracking butuh MediaPipe).
+    """
+    from visualizer import Visualizer
+    from quality import LEVEL_NAMES, QualityGovernor
+
+    width, height = RESOLUTIONS["720p"]
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    visualizer = Visualizer()
+    governor = QualityGovernor(visualizer=visualizer)
+    hands_data = HandState.from_dicts([synthetic_hand(90, 400, "right", (width, height)),
+                                       synthetic_hand(60, 800, "left", (width, height))])
+    audio_data = np.random.default_rng(0).random(visualizer.NUM_BARS)
+    results = {}
+    for index, level in enumerate(governor.levels):
+        governor._index = index
+        governor.apply()
+        results[level] = time_per_frame(
+            lambda i: visualizer.draw_visuals(frame, hands_data, 90, 60, audio_data), frames)
+        print(f"Level {level} ({LEVEL_NAMES[level]}): {results[level]:.3f} ms/frame")
+    return results
+
+
+def bench_filters(fps=30.0, seconds=10.0, noise=0.003, frequencies=(0.0, 0.5, 1.5), infer_every=(1, 2)):
+    """
+    Galat RMS filter landmark pada gerakan sinus ±0,2 (koordinat ternormalisasi) dengan derau pengukuran.
+
+    "tahan" memakai inferensi terakhir apa adanya di antara inferensi (perilaku tanpa filter).
+    """
+    from landmark_filter import create_filter
+
+    rng = np.random.default_rng(0)
+    t = np.arange(int(fps * seconds)) / fps
+    settle = int(fps)  # Detik pertama diabaikan (filter masih menyesuaikan)
+    results = {}
+    for frequency in frequencies:
+        truth = 0.5 + 0.2 * np.sin(2 * np.pi * frequency * t)
+        measured = truth + rng.normal(0.0, noise, len(t))
+        for every in infer_every:
+            row = {}
+            for name in (None, "one_euro", "kalman"):
+                landmark_filter = create_filter(name, decimated=every > 1)
+                out = np.empty(len(t))
+                for i, now in enumerate(t):
+                    if i % every == 0:
+                        value = measured[i:i + 1] if landmark_filter is None else landmark_filter.update(measured[i:i + 1], now)
+                        out[i] = value[0]
+                    else:
+                        out[i] = out[i - 1] if landmark_filter is None else landmark_filter.predict(now)[0]
+                row[name or "tahan"] = float(np.sqrt(np.mean((out - truth)[settle:] ** 2)))
+            results[(frequency, every)] = row
+            print(f"{frequency:.1f} Hz, inferensi tiap {every}: " +
+                  "  ".join(f"{name} {error:.4f}" for name, error in row.items()))
+    return results
+
+
+def make_fixture_video(path, frames=300, size=(640, 480), fps=30):
+    """
+    Membuat video sintetis deterministik: dua blob warna kulit yang bergerak di atas latar bertekstur.
+
+    Blob bukan tangan, sehingga MediaPipe tidak mendeteksi apa pun: video ini hanya mengukur biaya
+    capture dan inferensi. Jalur MIDI dan render dengan tangan diukur oleh bench_replay.
+    """
+    width, height = size
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, size)
+    rng = np.random.default_rng(0)
+    background = rng.integers(40, 90, (height, width, 3), dtype=np.uint8)
+    for i in range(frames):
+        frame = background.copy()
+        t = i / fps
+        for phase, x_center in ((0.0, width // 3), (np.pi / 2, 2 * width // 3)):
+            center = (int(x_center + 60 * np.sin(t + phase)), int(height / 2 + 40 * np.cos(1.3 * t + phase)))
+            cv2.ellipse(frame, center, (45, 70), 0, 0, 360, (120, 160, 210), -1, cv2.LINE_AA)
+        writer.write(frame)
+    writer.release()
+
+
+def make_fixture_wav(path, seconds=10.0, rate=44100):
+    """
+    Membuat WAV sintetis deterministik: akor sinus dengan ketukan 120 BPM.
+    """
+    t = np.arange(int(seconds * rate)) / rate
+    signal = sum(0.2 * np.sin(2 * np.pi * f * t) for f in (110.0, 440.0, 2500.0))
+    beat = np.exp(-30 * (t % 0.5)) * np.sin(2 * np.pi * 60.0 * t)  # Kick tiap 0,5 detik
+    samples = np.clip((signal + 0.5 * beat) * 12000, -32768, 32767).astype(np.int16)
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(samples.tobytes())
+
+
+def make_fixture_recording(path, frames=300, fps=30, frame_size=(640, 480)):
+    """
+    Membuat rekaman sintetis deterministik: tangan kiri dan kanan yang membuka dan menutup jepitan
+    dengan laju berbeda, sehingga pemetaan bawaan (volume, EQ, speed) mengirim CC.
+    """
+    from recording import Recorder
+    recorder = Recorder(path)
+    for i in range(frames):
+        t = i / fps
+        left = 127 * (0.5 + 0.5 * np.sin(2 * np.pi * 0.5 * t))
+        right = 127 * (0.5 + 0.5 * np.sin(2 * np.pi * 0.3 * t + 1.0))
+        state = HandState.from_dicts([synthetic_hand(left, 160, "left", frame_size),
+                                      synthetic_hand(right, 480, "right", frame_size)])
+        recorder.record_frame(t, state)
+    recorder.close()
+
+
+def fixture_paths():
+    """
+    Mengembalikan path fixture bawaan, membuatnya jika belum ada.
+    """
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    video_path = os.path.join(FIXTURE_DIR, "hands_640x480.avi")
+    wav_path = os.path.join(FIXTURE_DIR, "music_44k.wav")
+    if not os.path.exists(video_path):
+        make_fixture_video(video_path)
+    if not os.path.exists(wav_path):
+        make_fixture_wav(wav_path)
+    return video_path, wav_path
+
+
+def run_serial(cap, hand_tracker, midi_controller, visualizer, audio_capture, instrumentation, display):
+    """
+    Menjalankan semua tahap berurutan per frame (pengukuran per tahap yang deterministik).
+
+    visualizer dan audio_capture bernilai None untuk mode headless (hanya capture -> tracking -> MIDI).
+    """
+    frames = 0
+    while True:
+        start = time.perf_counter()
+        ret, frame = cap.read()
+        if not ret or frame is None or frame.size == 0:
+            break
+        timestamp = time.perf_counter()
+        instrumentation.record("capture", timestamp - start)
+
+        start = time.perf_counter()
+        hands_data = hand_tracker.track_hands(frame)
+        instrumentation.record_since("inference", start)
+
+        start = time.perf_counter()
+        midi_controller.send_midi_signals(hands_data, timestamp)
+        instrumentation.record_since("midi", start)
+
+        if visualizer is None:
+            frames += 1
+            continue
+
+        start = time.perf_counter()
+        audio_data = audio_capture.get_audio_data()
+        instrumentation.record_since("audio", start)
+
+        start = time.perf_counter()
+        volume, filter_level, label_hands = midi_controller.mapper.labels(hands_data)
+        frame = visualizer.draw_visuals(frame, hands_data, volume, filter_level, audio_data, label_hands)
+        instrumentation.record_since("render", start)
+
+        if display:
+            start = time.perf_counter()
+            cv2.imshow("Benchmark", frame)
+            cv2.waitKey(1)
+            instrumentation.record_since("display", start)
+        frames += 1
+
+    cap.release()
+    midi_controller.close()
+    if audio_capture is not None:
+        audio_capture.close()
+    if visualizer is not None:
+        visualizer.close()
+    if display and visualizer is not None:
+        cv2.destroyAllWindows()
+    return frames
+
+
+def print_comparison(result, baseline, label="baseline"):
+    """
+    Mencetak selisih frame/detik, jumlah pesan CC, dan p50/p95 per tahap terhadap hasil pembanding.
+    """
+    print(f"Dibanding {label}: {result['fps'] - baseline['fps']:+.1f} frame/s, "
+          f"{result['cc_messages'] - baseline['cc_messages']:+d} pesan CC")
+    for stage, stats in result["stages"].items():
+        if stage in baseline["stages"]:
+            other = baseline["stages"][stage]
+            print(f"  {stage:<18} p50 {stats['p50_ms'] - other['p50_ms']:+7.2f}  "
+                  f"p95 {stats['p95_ms'] - other['p95_ms']:+7.2f} ms")
+
+
+def bench_pipeline(video_path=None, wav_path=None, display=False, threaded=False, json_path=None, baseline_path=None,
+                   headless=False, tracker_kwargs=None):
+    """
+    Memutar ulang video dan WAV melalui pipeline lengkap tanpa kamera, Stereo Mix, atau port MIDI.
+
+    Melaporkan frame/detik, waktu per tahap, dan jumlah pesan CC per run. Fixture video bawaan
+    tidak berisi tangan (CC tetap 0); untuk jalur MIDI/render dengan tangan pakai bench_replay.
+    headless=True hanya menjalankan capture -> tracking -> MIDI (tanpa render, audio, dan tampilan).
+    tracker_kwargs diteruskan ke HandTracker (mode, infer_every, infer_budget_ms, landmark_filter).
+    """
+    # Diimpor di sini agar benchmark teks/MIDI tetap jalan tanpa MediaPipe
+    from hand_tracking import HandTracker
+    from pipeline import Pipeline
+    if not headless:
+        # Mode headless tidak butuh PyAudio maupun penggambar
+        from visualizer import Visualizer
+        from audio_capture import AudioCapture
+
+    default_video, default_wav = fixture_paths() if not (video_path and wav_path) else (None, None)
+    video_path = video_path or default_video
+    wav_path = wav_path or default_wav
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        print(f"Video '{video_path}' tidak dapat dibuka!")
+        return None
+
+    outport = MemoryOutput()  # Sink MIDI di memori
+    hand_tracker = HandTracker(**(tracker_kwargs or {}))
+    midi_controller = MidiController(outport=outport)
+    visualizer = None if headless else Visualizer()
+    instrumentation = Instrumentation(enabled=True)
+    midi_controller.engine.on_send = instrumentation.on_midi_send
+
+    start = time.perf_counter()
+    if headless:
+        audio_capture = None
+        display = False
+    if threaded:
+        if not headless:
+            audio_capture = AudioCapture(mode="callback", source=wav_path, num_bands=visualizer.NUM_BARS)
+        pipeline = Pipeline(cap, hand_tracker, midi_controller, visualizer, audio_capture,
+                            instrumentation=instrumentation, show=display)
+        pipeline.run()
+        frames = pipeline.tracked_frames
+    else:
+        if not headless:
+            audio_capture = AudioCapture(source=wav_path, num_bands=visualizer.NUM_BARS)
+        frames = run_serial(cap, hand_tracker, midi_controller, visualizer, audio_capture, instrumentation, display)
+    elapsed = time.perf_counter() - start
+
+    result = {
+        "video": video_path,
+        "wav": wav_path,
+        "mode": ("threaded" if threaded else "serial") + (" headless" if headless else ""),
+        "tracker": tracker_kwargs or {},
+        "frames": frames,
+        "fps": frames / elapsed if elapsed > 0 else 0.0,
+        "cc_messages": len(outport.messages),
+        "stages": instrumentation.total_summary(),
+    }
+
+    print(f"{result['mode']}: {frames} frame dalam {elapsed:.2f} s -> {result['fps']:.1f} frame/s, "
+          f"{result['cc_messages']} pesan CC")
+    for stage, stats in result["stages"].items():
+        print(f"  {stage:<18} p50 {stats['p50_ms']:7.2f}  p95 {stats['p95_ms']:7.2f}  p99 {stats['p99_ms']:7.2f} ms")
+
+    if baseline_path:
+        # Bandingkan dengan hasil run sebelumnya untuk mendeteksi regresi
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        print_comparison(result, baseline)
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Hasil disimpan ke '{json_path}'.")
+    return result
+
+
+def bench_replay(recording_path=None, display=False, headless=False, json_path=None):
+    """
+    Memutar rekaman landmark (default: rekaman sintetis dua tangan) ke MIDI dan render tanpa MediaPipe.
+
+    Melengkapi bench_pipeline: fixture video tidak berisi tangan, sedangkan rekaman ini
+    menggerakkan pemetaan sehingga biaya MIDI, jumlah pesan CC, dan render label ikut terukur.
+    """
+    from recording import Replayer, recording_paths
+    if recording_path is None:
+        os.makedirs(FIXTURE_DIR, exist_ok=True)
+        recording_path = os.path.join(FIXTURE_DIR, "hands_recording")
+        if not os.path.exists(recording_paths(recording_path)[0]):
+            make_fixture_recording(recording_path)
+
+    replayer = Replayer(recording_path)
+    outport = MemoryOutput()  # Sink MIDI di memori
+    midi_controller = MidiController(outport=outport)
+    visualizer = None
+    if not headless:
+        from visualizer import Visualizer
+        visualizer = Visualizer()
+    instrumentation = Instrumentation(enabled=True)
+    midi_controller.engine.on_send = instrumentation.on_midi_send
+
+    start = time.perf_counter()
+    try:
+        frames = replayer.replay(midi_controller, visualizer, realtime=False, show=display and not headless,
+                                 instrumentation=instrumentation)
+    finally:
+        midi_controller.close()
+        if visualizer is not None:
+            visualizer.close()
+        if display and not headless:
+            cv2.destroyAllWindows()
+    elapsed = time.perf_counter() - start
+
+    result = {
+        "recording": recording_path,
+        "mode": "replay" + (" headless" if headless else ""),
+        "frames": frames,
+        "fps": frames / elapsed if elapsed > 0 else 0.0,
+        "cc_messages": len(outport.messages),
+        "stages": instrumentation.total_summary(),
+    }
+    print(f"{result['mode']}: {frames} frame dalam {elapsed:.2f} s -> {result['fps']:.1f} frame/s, "
+          f"{result['cc_messages']} pesan CC")
+    for stage, stats in result["stages"].items():
+        print(f"  {stage:<18} p50 {stats['p50_ms']:7.2f}  p95 {stats['p95_ms']:7.2f}  p99 {stats['p99_ms']:7.2f} ms")
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Hasil disimpan ke '{json_path}'.")
+    return result
+
+
+def bench_supervisor(video_path=None, worker_counts=(1, 2, 4)):
+    """
+    Mengukur throughput total Supervisor untuk jumlah worker yang berbeda (semua memutar video yang sama).
+    """
+    from supervisor import Supervisor
+
+    video_path = video_path or fixture_paths()[0]
+    results = []
+    for workers in worker_counts:
+        outports = [MemoryOutput() for _ in range(workers)]
+        sources = [{"source": video_path, "port": f"memory {i}", "channel": 0, "outport": outports[i]}
+                   for i in range(workers)]
+        supervisor = Supervisor(sources, verbose=False)
+        supervisor.run()  # Selesai saat semua worker mencapai akhir video
+        throughput = sum(stats["avg_fps"] for stats in supervisor.final_stats)
+        messages = sum(len(outport.messages) for outport in outports)
+        results.append({"workers": workers, "fps": throughput, "cc_messages": messages})
+        print(f"{workers} worker: total {throughput:.1f} frame/s "
+              f"({throughput / workers:.1f} per worker), {messages} pesan CC")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark komponen FL Studio Visual Control")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    text_parser = subparsers.add_parser("text", help="Biaya penggambaran label teks per frame")
+    text_parser.add_argument("--frames", type=int, default=200, help="Jumlah frame yang diukur")
+
+    midi_parser = subparsers.add_parser("midi", help="Throughput dan latensi mesin output MIDI")
+    midi_parser.add_argument("--frames", type=int, default=3000, help="Jumlah frame data tangan")
+    midi_parser.add_argument("--max-rate", type=float, default=100.0, help="Batas pesan per detik per CC")
+
+    logging_parser = subparsers.add_parser("logging", help="Biaya print dibanding logger asinkron per panggilan")
+    logging_parser.add_argument("--frames", type=int, default=20000, help="Jumlah panggilan yang diukur")
+
+    mapping_parser = subparsers.add_parser("mapping", help="Biaya evaluasi pemetaan gestur per frame")
+    mapping_parser.add_argument("--frames", type=int, default=2000, help="Jumlah frame yang diukur")
+
+    overlay_parser = subparsers.add_parser("overlay", help="Biaya penggambaran spektrum per frame")
+    overlay_parser.add_argument("--frames", type=int, default=200, help="Jumlah frame yang diukur")
+
+    audio_parser = subparsers.add_parser("audio-features", help="Biaya fitur audio per blok dan deteksi onset/tempo")
+    audio_parser.add_argument("--wav", help="File WAV 16-bit (default: fixture sintetis 120 BPM)")
+
+    filters_parser = subparsers.add_parser("filters", help="Galat dan lag filter landmark pada gerakan sinus")
+    filters_parser.add_argument("--noise", type=float, default=0.003, help="Derau pengukuran (koordinat ternormalisasi)")
+
+    quality_parser = subparsers.add_parser("quality", help="Biaya penggambaran per level kualitas")
+    quality_parser.add_argument("--frames", type=int, default=200, help="Jumlah frame yang diukur")
+
+    supervisor_parser = subparsers.add_parser("supervisor", help="Skala throughput multi-proses per jumlah worker")
+    supervisor_parser.add_argument("--video", help="File video (default: fixture sintetis)")
+    supervisor_parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Jumlah worker yang diuji")
+
+    replay_parser = subparsers.add_parser("replay", help="Putar rekaman landmark ke MIDI + render (tanpa MediaPipe)")
+    replay_parser.add_argument("--recording", help="Nama dasar rekaman (default: rekaman sintetis dua tangan)")
+    replay_parser.add_argument("--display", action="store_true", help="Tampilkan frame dengan cv2.imshow")
+    replay_parser.add_argument("--headless", action="store_true", help="Hanya MIDI, tanpa render")
+    replay_parser.add_argument("--json", help="Simpan hasil ke file JSON")
+
+    pipeline_parser = subparsers.add_parser("pipeline", help="Putar ulang video + WAV melalui pipeline lengkap")
+    pipeline_parser.add_argument("--video", help="File video (default: fixture sintetis)")
+    pipeline_parser.add_argument("--wav", help="File WAV 16-bit (default: fixture sintetis)")
+    pipeline_parser.add_argument("--display", action="store_true", help="Tampilkan frame dengan cv2.imshow")
+    pipeline_parser.add_argument("--threaded", action="store_true", help="Pakai Pipeline multi-thread, bukan loop serial")
+    pipeline_parser.add_argument("--json", help="Simpan hasil ke file JSON")
+    pipeline_parser.add_argument("--baseline", help="File JSON hasil sebelumnya untuk dibandingkan")
+    pipeline_parser.add_argument("--headless", action="store_true", help="Hanya capture -> tracking -> MIDI")
+    pipeline_parser.add_argument("--compare-headless", action="store_true",
+                                 help="Jalankan mode UI lengkap lalu headless dan tampilkan selisihnya")
+    pipeline_parser.add_argument("--tracker-mode", default="full", choices=["full", "roi"],
+                                 help="Mode inferensi HandTracker")
+    pipeline_parser.add_argument("--infer-every", type=int, default=1, help="Jalankan MediaPipe tiap N frame")
+    pipeline_parser.add_argument("--infer-budget-ms", type=float, help="Anggaran rata-rata inferensi per frame (ms)")
+    pipeline_parser.add_argument("--landmark-filter", choices=FILTER_NAMES, help="Filter landmark di antara inferensi")
+
+    args = parser.parse_args()
+    if args.command == "pipeline":
+        tracker_kwargs = {"mode": args.tracker_mode, "infer_every": args.infer_every,
+                          "infer_budget_ms": args.infer_budget_ms, "landmark_filter": args.landmark_filter}
+    if args.command == "text":
+        bench_text(args.frames)
+    elif args.command == "midi":
+        bench_midi(args.frames, max_rate_hz=args.max_rate)
+    elif args.command == "logging":
+        bench_logging(args.frames)
+    elif args.command == "mapping":
+        bench_mapping(args.frames)
+    elif args.command == "overlay":
+        bench_overlay(args.frames)
+    elif args.command == "audio-features":
+        bench_audio_features(args.wav)
+    elif args.command == "filters":
+        bench_filters(noise=args.noise)
+    elif args.command == "quality":
+        bench_quality(args.frames)
+    elif args.command == "replay":
+        bench_replay(args.recording, args.display, args.headless, args.json)
+    elif args.command == "supervisor":
+        bench_supervisor(args.video, args.workers)
+    elif args.command == "pipeline" and args.compare_headless:
+        full = bench_pipeline(args.video, args.wav, args.display, args.threaded, tracker_kwargs=tracker_kwargs)
+        headless = bench_pipeline(args.video, args.wav, threaded=args.threaded, json_path=args.json, headless=True,
+                                  tracker_kwargs=tracker_kwargs)
+        if full and headless:
+            print_comparison(headless, full, "UI lengkap")
+    elif args.command == "pipeline":
+        bench_pipeline(args.video, args.wav, args.display, args.threaded, args.json, args.baseline, args.headless,
+                       tracker_kwargs)
+
+
+if __name__ == "__main__":
+    main()
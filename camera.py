@@ -0,0 +1,198 @@
+import threading
+import time
+import cv2
+from logger import get_logger
+
+log = get_logger("camera")
+
+# Format piksel kamera yang umum (pilihan --fourcc)
+FOURCC_CODES = ("MJPG", "YUYV", "YUY2", "H264")
+
+
+def parse_camera_source(source):
+    """
+    Indeks kamera ("0", "1") menjadi int, selain itu dianggap path/URL video.
+    """
+    if isinstance(source, str) and source.isdigit():
+        return int(source)
+    return source
+
+
+class CameraCapture:
+    """
+    Capture kamera latensi rendah dengan thread grabber.
+
+    Thread grabber membaca frame secepat kamera menghasilkannya sehingga buffer driver
+    tidak pernah menumpuk; hanya frame terbaru (beserta waktu capture-nya) yang disimpan.
+    Frame yang tertimpa sebelum sempat dibaca dihitung sebagai dropped.
+
+    Sumber boleh berupa file video (untuk pengujian tanpa kamera); dengan realtime=True
+    frame file diputar sesuai FPS file, seperti kamera sungguhan.
+
+    read() kompatibel dengan cv2.VideoCapture: menunggu frame baru lalu mengembalikan (ret, frame).
+    """
+
+    def __init__(self, source=0, width=None, height=None, fps=None, fourcc=None, buffer_size=1, realtime=True,
+                 backend=cv2.CAP_ANY):
+        self.source = parse_camera_source(source)  # Indeks kamera atau path/URL video
+        self.is_file = not isinstance(self.source, int)
+        self.width = width  # Resolusi yang diminta (None = bawaan driver)
+        self.height = height
+        self.fps = fps  # FPS yang diminta (None = bawaan driver)
+        self.fourcc = fourcc  # Format piksel, misalnya "MJPG" atau "YUYV" (None = bawaan driver)
+        self.buffer_size = buffer_size  # Jumlah frame di buffer driver (1 = selalu terbaru)
+        self.realtime = realtime  # Putar file video sesuai FPS-nya
+
+        self._cond = threading.Condition()
+        self._frame = None
+        self._timestamp = 0.0  # Waktu perf_counter saat frame terakhir di-grab
+        self._seq = 0  # Nomor urut frame terakhir dari grabber
+        self._read_seq = 0  # Nomor urut frame terakhir yang dikembalikan read()
+        self._ended = False
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        # Statistik
+        self.frames = 0  # Frame yang di-grab
+        self.dropped = 0  # Frame yang tertimpa sebelum dibaca
+        self.timestamp = 0.0  # Waktu capture frame terakhir yang dikembalikan read()
+
+        self.cap = cv2.VideoCapture(self.source, backend)
+        if not self.cap.isOpened():
+            self.cap.release()
+            raise RuntimeError(f"Sumber video '{source}' tidak dapat dibuka!")
+        if not self.is_file:
+            self._configure()
+        # FPS sebenarnya (dari driver/file) untuk pacing dan laporan
+        self.actual_fps = self.cap.get(cv2.CAP_PROP_FPS) or 0.0
+
+    def _configure(self):
+        # Urutan penting: FOURCC dulu, karena sebagian driver mereset resolusi/FPS saat format berubah
+        cap = self.cap
+        if self.fourcc:
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*self.fourcc))
+        if self.width:
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        if self.height:
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        if self.fps:
+            cap.set(cv2.CAP_PROP_FPS, self.fps)
+        if self.buffer_size:
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)
+
+        # Driver boleh menolak pengaturan; laporkan nilai yang benar-benar dipakai
+        settings = self.settings()
+        log.info("Kamera {source}: {width}x{height} @ {fps:.1f} fps, format {fourcc}, buffer {buffer}",
+                 source=self.source, width=settings["width"], height=settings["height"], fps=settings["fps"],
+                 fourcc=settings["fourcc"] or "-", buffer=settings["buffer_size"])
+
+    def settings(self):
+        """
+        Pengaturan yang benar-benar aktif menurut driver.
+        """
+        code = int(self.cap.get(cv2.CAP_PROP_FOURCC))
+        fourcc = "".join(chr((code >> 8 * i) & 0xFF) for i in range(4)).strip("\x00") if code else ""
+        return {
+            "width": int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": self.cap.get(cv2.CAP_PROP_FPS),
+            "fourcc": fourcc,
+            "buffer_size": int(self.cap.get(cv2.CAP_PROP_BUFFERSIZE)),
+        }
+
+    def start(self):
+        """
+        Menjalankan thread grabber (dipanggil otomatis oleh read() pertama).
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._grab_loop, name="camera-grabber", daemon=True)
+            self._thread.start()
+        return self
+
+    def _grab_loop(self):
+        interval = 1.0 / self.actual_fps if self.is_file and self.realtime and self.actual_fps > 0 else 0.0
+        next_time = time.perf_counter()
+        try:
+            while not self._stop_event.is_set():
+                if interval:
+                    # File video: tunggu sampai jadwal frame berikutnya, seperti kamera sungguhan
+                    delay = next_time - time.perf_counter()
+                    if delay > 0:
+                        self._stop_event.wait(delay)
+                    next_time = max(next_time + interval, time.perf_counter() - interval)
+
+                # grab() menandai waktu capture; decode (retrieve) dilakukan setelahnya
+                if not self.cap.grab():
+                    break
+                timestamp = time.perf_counter()
+                ret, frame = self.cap.retrieve()
+                if not ret or frame is None or frame.size == 0:
+                    break
+
+                with self._cond:
+                    if self._seq > self._read_seq:
+                        self.dropped += 1  # Frame sebelumnya belum sempat dibaca
+                    self._frame = frame
+                    self._timestamp = timestamp
+                    self._seq += 1
+                    self.frames += 1
+                    self._cond.notify_all()
+        except Exception as e:
+            log.error("Thread grabber kamera berhenti karena error: {error}", error=e)
+        finally:
+            with self._cond:
+                self._ended = True
+                self._cond.notify_all()
+
+    def read_latest(self, timeout=None):
+        """
+        Menunggu frame yang lebih baru dari frame terakhir yang dibaca.
+
+        Mengembalikan (frame, timestamp); (None, None) jika sumber habis/gagal atau timeout.
+        """
+        self.start()
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > self._read_seq or self._ended, timeout):
+                return None, None
+            if self._seq == self._read_seq:
+                return None, None  # Sumber berakhir dan tidak ada frame baru
+            self._read_seq = self._seq
+            self.timestamp = self._timestamp
+            return self._frame, self._timestamp
+
+    def read(self):
+        frame, _ = self.read_latest()
+        return frame is not None, frame
+
+    def grab(self):
+        # Kompatibel dengan cv2.VideoCapture.grab(): sebelum thread berjalan, langsung ke driver
+        if self._thread is None:
+            return self.cap.grab()
+        return not self._ended
+
+    def isOpened(self):
+        return self.cap.isOpened() and not self._ended
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def stats(self):
+        """
+        Statistik capture: frame di-grab, frame terbuang, dan umur frame terakhir yang dibaca (ms).
+        """
+        with self._cond:
+            return {
+                "frames": self.frames,
+                "dropped": self.dropped,
+                "age_ms": (time.perf_counter() - self.timestamp) * 1000.0 if self.timestamp else None,
+            }
+
+    def release(self):
+        """
+        Menghentikan thread grabber lalu menutup kamera.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+        self.cap.release()
@@ -0,0 +1,311 @@
+import json
+import numpy as np
+from hand_state import as_hand_state
+
+# Nama 21 landmark tangan MediaPipe (indeks sesuai urutan)
+LANDMARK_NAMES = [
+    "wrist",
+    "thumb_cmc", "thumb_mcp", "thumb_ip", "thumb_tip",
+    "index_finger_mcp", "index_finger_pip", "index_finger_dip", "index_finger_tip",
+    "middle_finger_mcp", "middle_finger_pip", "middle_finger_dip", "middle_finger_tip",
+    "ring_finger_mcp", "ring_finger_pip", "ring_finger_dip", "ring_finger_tip",
+    "pinky_mcp", "pinky_pip", "pinky_dip", "pinky_tip",
+]
+LANDMARK_INDEX = {name: i for i, name in enumerate(LANDMARK_NAMES)}
+
+# Slot tangan: berdasarkan handedness (left/right) dan berdasarkan urutan deteksi (first/second)
+HAND_SLOTS = {"left": 0, "right": 1, "first": 2, "second": 3}
+
+# Jenis fitur dan rentang input bawaannya
+FEATURES = ("distance", "direction", "joint_angle", "height", "x")
+DEFAULT_RANGES = {
+    "distance": (0.0, 1.5),  # Ukuran telapak (pergelangan -> pangkal jari tengah) atau tinggi frame
+    "direction": (-180.0, 180.0),  # Derajat, 0 = ke kanan, 90 = ke atas
+    "joint_angle": (0.0, 180.0),  # Derajat sudut di titik tengah
+    "height": (0.0, 1.0),  # 0 = bawah frame, 1 = atas frame
+    "x": (0.0, 1.0),  # 0 = kiri frame, 1 = kanan frame
+}
+CURVES = {"linear": 1.0, "exp": 2.0, "log": 0.5}
+GATE_HYSTERESIS = 0.05  # Lebar histeresis gerbang on/off (dalam skala 0-1)
+
+# Pemetaan bawaan: setara dengan perilaku lama (CC 7, 10, 22), tetapi tangan dipilih berdasarkan
+# handedness dan jarak diukur relatif terhadap ukuran telapak, bukan piksel
+DEFAULT_MAPPINGS = [
+    {"name": "volume", "hand": "right", "feature": "distance", "points": ["thumb_tip", "index_finger_tip"],
+     "range": [0.1, 1.0], "cc": 7},
+    {"name": "eq", "hand": "left", "feature": "distance", "points": ["thumb_tip", "index_finger_tip"],
+     "range": [0.1, 1.0], "cc": 10},
+    {"name": "speed", "hands": ["left", "right"], "feature": "distance", "points": ["thumb_tip", "thumb_tip"],
+     "scale": "frame", "range": [0.0, 1.0], "invert": True, "out": [0, 60], "smoothing": 0.2, "cc": 22},
+]
+
+
+def load_mappings(path):
+    """
+    Membaca daftar pemetaan dari file JSON (list objek, atau objek dengan kunci "mappings").
+    """
+    with open(path) as f:
+        config = json.load(f)
+    return config["mappings"] if isinstance(config, dict) else config
+
+
+def _landmark(point):
+    if isinstance(point, str):
+        if point not in LANDMARK_INDEX:
+            raise ValueError(f"Nama landmark tidak dikenal: {point}")
+        return LANDMARK_INDEX[point]
+    if not 0 <= int(point) < len(LANDMARK_NAMES):
+        raise ValueError(f"Indeks landmark di luar 0-20: {point}")
+    return int(point)
+
+
+class GestureMapper:
+    """
+    Mesin pemetaan gestur -> MIDI berbasis konfigurasi.
+
+    Setiap pemetaan mengikat satu fitur landmark (jarak, arah, sudut sendi, tinggi, posisi x,
+    atau pinch) ke CC atau not MIDI, dengan rentang input, kurva, inversi, rentang output,
+    smoothing, dan gerbang on/off. Semua pemetaan dikompilasi menjadi array indeks sehingga
+    evaluasi satu frame adalah sejumlah tetap operasi NumPy, berapa pun jumlah pemetaannya.
+
+    Kunci pemetaan:
+        name        nama (opsional, untuk tampilan)
+        feature     "distance", "angle", "height", "x", atau "pinch"
+        hand        "left", "right", "first", atau "second" untuk semua titik (bawaan "first")
+        hands       daftar slot tangan per titik (untuk fitur dua tangan)
+        points      nama atau indeks landmark; angle dengan 2 titik = arah, 3 titik = sudut sendi
+        scale       "palm" (bawaan untuk jarak) atau "frame" (tinggi frame)
+        range       rentang input [min, max]
+        curve       "linear", "exp", "log", "smoothstep", atau angka gamma
+        invert      balik arah (true/false)
+        out         rentang output [min, max], bawaan [0, 127]
+        smoothing   faktor smoothing eksponensial 0-1 (1 = tanpa smoothing)
+        gate        ambang 0-1; output menjadi on/off dengan histeresis
+        threshold   (pinch) jarak maksimum dalam ukuran telapak, bawaan 0.3
+        cc / note   nomor CC atau not tujuan; velocity untuk not (bawaan 100)
+        channel     channel MIDI (bawaan channel kontroler)
+    """
+
+    def __init__(self, mappings=None, channel=0):
+        self.mappings = [dict(m) for m in (DEFAULT_MAPPINGS if mappings is None else mappings)]
+        self.channel = channel  # Channel bawaan untuk pemetaan tanpa "channel"
+        self._compile()
+
+    def _compile(self):
+        rows = [self._compile_one(m) for m in self.mappings]
+        count = len(rows)
+        columns = list(zip(*rows)) if rows else [()] * 16
+        (hands, points, kinds, palm, lo, hi, gamma, smoothstep, invert, out_lo, out_hi, alpha, gate,
+         is_note, numbers, channels) = columns
+
+        self.hands = np.array(hands, dtype=np.intp).reshape(count, 3)  # Slot tangan titik a, b, c
+        self.points = np.array(points, dtype=np.intp).reshape(count, 3)  # Indeks landmark titik a, b, c
+        self.kinds = np.array(kinds, dtype=np.intp)
+        self.palm = np.array(palm, dtype=bool)
+        self.lo = np.array(lo, dtype=np.float64)
+        self.span = np.array(hi, dtype=np.float64) - self.lo
+        self.span[self.span == 0] = 1e-9
+        self.gamma = np.array(gamma, dtype=np.float64)
+        self.smoothstep = np.array(smoothstep, dtype=bool)
+        self.invert = np.array(invert, dtype=bool)
+        self.out_lo = np.array(out_lo, dtype=np.float64)
+        self.out_span = np.array(out_hi, dtype=np.float64) - self.out_lo
+        self.alpha = np.array(alpha, dtype=np.float64)
+        self.gate = np.array(gate, dtype=np.float64)
+        self.has_gate = ~np.isnan(self.gate)
+        self.is_note = np.array(is_note, dtype=bool)
+        self.numbers = list(numbers)  # Nomor CC atau not per pemetaan
+        self.channels = list(channels)
+        self.velocities = [int(m.get("velocity", 100)) for m in self.mappings]
+
+        # State per pemetaan
+        self.state = np.zeros(count)  # Nilai 0-1 terakhir (sudah di-smoothing)
+        self.has_state = np.zeros(count, dtype=bool)
+        self.gate_on = np.zeros(count, dtype=bool)
+        self.last_out = np.full(count, -1, dtype=np.int64)  # Output terakhir yang dikirim
+        self._slots = np.zeros((len(HAND_SLOTS), 21, 2))  # Buffer slot tangan yang dipakai ulang
+        self._valid = np.zeros(len(HAND_SLOTS), dtype=bool)
+        self._rows = np.arange(count)
+        self._by_name = {name: i for i, name in reversed(list(enumerate(self.names())))}  # Nama -> indeks pertama
+
+    def _compile_one(self, m):
+        feature = m.get("feature", "distance")
+        points = [_landmark(p) for p in m.get("points", [])]
+        gate = m.get("gate")
+        invert = bool(m.get("invert", False))
+
+        if feature == "pinch":
+            # Pinch: jarak dua titik (bawaan ibu jari-telunjuk) di bawah ambang, dengan histeresis
+            threshold = float(m.get("threshold", 0.3))
+            points = points or [LANDMARK_INDEX["thumb_tip"], LANDMARK_INDEX["index_finger_tip"]]
+            feature, value_range, invert, gate = "distance", (0.0, 2 * threshold), not invert, 0.5
+        elif feature == "angle":
+            feature = "joint_angle" if len(points) == 3 else "direction"
+            value_range = DEFAULT_RANGES[feature]
+        elif feature in ("distance", "height", "x"):
+            value_range = DEFAULT_RANGES[feature]
+        else:
+            raise ValueError(f"Fitur gestur tidak dikenal: {feature}")
+        value_range = m.get("range", value_range)
+
+        needed = {"distance": 2, "direction": 2, "joint_angle": 3, "height": 1, "x": 1}[feature]
+        if len(points) != needed:
+            raise ValueError(f"Fitur '{feature}' membutuhkan {needed} titik, bukan {len(points)}")
+        hand_names = m.get("hands") or [m.get("hand", "first")] * needed
+        if len(hand_names) != needed or any(name not in HAND_SLOTS for name in hand_names):
+            raise ValueError(f"Slot tangan tidak valid: {hand_names}")
+        hands = [HAND_SLOTS[name] for name in hand_names]
+        # Titik yang tidak dipakai menyalin titik pertama agar indeks selalu valid
+        hands += [hands[0]] * (3 - needed)
+        points += [points[0]] * (3 - needed)
+
+        curve = m.get("curve", "linear")
+        if "note" in m:
+            gate = 0.5 if gate is None else gate
+        if "cc" not in m and "note" not in m:
+            raise ValueError(f"Pemetaan '{m.get('name', feature)}' tidak punya tujuan 'cc' atau 'note'")
+        out = m.get("out", [0, 127])
+        return (
+            hands, points, FEATURES.index(feature),
+            feature == "distance" and m.get("scale", "palm") == "palm",
+            float(value_range[0]), float(value_range[1]),
+            float(CURVES.get(curve, 1.0) if isinstance(curve, str) else curve), curve == "smoothstep",
+            invert, float(out[0]), float(out[1]), float(m.get("smoothing", 1.0)),
+            np.nan if gate is None else float(gate),
+            "note" in m, int(m["note"] if "note" in m else m["cc"]), m.get("channel", self.channel),
+        )
+
+    def hand_slots(self, hands_data):
+        """
+        Mengisi array slot tangan (4, 21, 2) dalam satuan tinggi frame beserta validitas dan ukuran telapak.
+
+        Jika tidak ada tangan yang punya label handedness (misalnya rekaman lama), tangan pertama
+        dianggap kanan dan tangan kedua kiri, sama seperti pemetaan lama.
+        """
+        state = as_hand_state(hands_data)
+        slots, valid = self._slots, self._valid
+        valid[:] = False
+        count = state.count
+        w, h = state.frame_size
+        if not h:
+            return slots, valid, np.ones(len(HAND_SLOTS)), 1.0
+        first = HAND_SLOTS["first"]
+        np.divide(state.pixels[:count], h, out=slots[first:first + count])
+        valid[first:first + count] = True
+
+        # Kode handedness: 1 = kiri (slot 0), 2 = kanan (slot 1)
+        codes = state.handedness[:count].tolist()
+        if not any(codes):
+            codes = [2, 1][:count]
+        for i, code in enumerate(codes):
+            if code:
+                slots[code - 1] = slots[first + i]
+                valid[code - 1] = True
+
+        palm = np.hypot(*(slots[:, LANDMARK_INDEX["middle_finger_mcp"]] - slots[:, 0]).T)
+        return slots, valid, np.maximum(palm, 1e-6), w / h
+
+    def evaluate(self, hands_data):
+        """
+        Mengevaluasi semua pemetaan untuk satu frame.
+
+        Mengembalikan (indeks pemetaan yang outputnya berubah, array output integer semua pemetaan).
+        """
+        if not len(self._rows):
+            return self._rows, self.last_out
+        slots, valid, palm, aspect = self.hand_slots(hands_data)
+        ha, hb, hc = self.hands.T
+        pa = slots[ha, self.points[:, 0]]
+        pb = slots[hb, self.points[:, 1]]
+        pc = slots[hc, self.points[:, 2]]
+
+        # Semua jenis fitur dihitung untuk semua pemetaan sekaligus, lalu dipilih per pemetaan
+        ab = pb - pa
+        distance = np.hypot(ab[:, 0], ab[:, 1])
+        distance = np.where(self.palm, distance / palm[ha], distance)
+        direction = np.degrees(np.arctan2(-ab[:, 1], ab[:, 0]))
+        ba, bc = pa - pb, pc - pb
+        cosine = np.einsum("ij,ij->i", ba, bc) / np.maximum(np.hypot(*ba.T) * np.hypot(*bc.T), 1e-12)
+        joint_angle = np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+        height = 1.0 - pa[:, 1]
+        x = pa[:, 0] / aspect
+        feature = np.stack([distance, direction, joint_angle, height, x])[self.kinds, self._rows]
+
+        # Rentang input -> 0..1, kurva, inversi
+        t = np.clip((feature - self.lo) / self.span, 0.0, 1.0)
+        t = np.where(self.smoothstep, t * t * (3 - 2 * t), t ** self.gamma)
+        t = np.where(self.invert, 1.0 - t, t)
+
+        # Smoothing eksponensial hanya untuk pemetaan yang semua tangannya terlihat
+        active = valid[ha] & valid[hb] & valid[hc]
+        smoothed = np.where(self.has_state, self.state + self.alpha * (t - self.state), t)
+        self.state = np.where(active, smoothed, self.state)
+        self.has_state |= active
+
+        # Gerbang on/off dengan histeresis (pinch, not); gerbang yang tangannya hilang dilepas
+        # agar not tidak menggantung
+        on = np.where(self.gate_on, self.state >= self.gate - GATE_HYSTERESIS,
+                      self.state >= self.gate + GATE_HYSTERESIS)
+        released = self.has_gate & self.gate_on & ~active
+        self.gate_on = np.where(active & self.has_gate, on, self.gate_on & ~released)
+        level = np.where(self.has_gate, self.gate_on, self.state)
+
+        out = np.rint(self.out_lo + level * self.out_span).astype(np.int64)
+        changed = np.flatnonzero((active | released) & (out != self.last_out))
+        self.last_out[changed] = out[changed]
+        return changed, self.last_out
+
+    def apply(self, engine, hands_data, origin=None):
+        """
+        Mengevaluasi pemetaan dan mengirim hanya output yang berubah ke MidiOutputEngine.
+        """
+        changed, out = self.evaluate(hands_data)
+        for i in changed:
+            if self.is_note[i]:
+                engine.note(self.numbers[i], self.velocities[i] if out[i] else 0, self.channels[i], origin)
+            else:
+                engine.update(self.numbers[i], out[i], self.channels[i], origin)
+        return len(changed)
+
+    def output(self, name):
+        """
+        Output terakhir pemetaan bernama name beserta slot tangannya (HAND_SLOTS).
+
+        Dipakai label tampilan agar nilai yang digambar sama dengan yang dikirim; output yang
+        belum pernah dikirim bernilai 0. Mengembalikan (None, None) jika pemetaan tidak ada.
+        """
+        i = self._by_name.get(name)
+        if i is None:
+            return None, None
+        return max(int(self.last_out[i]), 0), int(self.hands[i, 0])
+
+    def hand_index(self, hands_data, slot):
+        """
+        Indeks tangan di hands_data yang mengisi slot (aturan sama dengan hand_slots), atau None.
+        """
+        state = as_hand_state(hands_data)
+        count = state.count
+        first = HAND_SLOTS["first"]
+        if slot >= first:
+            return slot - first if slot - first < count else None
+        codes = state.handedness[:count].tolist()
+        if not any(codes):
+            codes = [2, 1][:count]
+        return codes.index(slot + 1) if slot + 1 in codes else None
+
+    def labels(self, hands_data, names=("volume", "eq")):
+        """
+        Nilai label tampilan (volume, filter) dari pemetaan names dan indeks tangan tempat masing-masing digambar.
+
+        Mengembalikan (volume, filter_level, (tangan_volume, tangan_filter)); nilai dan tangan
+        bernilai None jika pemetaannya tidak ada atau tangannya tidak terlihat.
+        """
+        values, hands = [], []
+        for name in names:
+            value, slot = self.output(name)
+            values.append(value)
+            hands.append(None if slot is None else self.hand_index(hands_data, slot))
+        return values[0], values[1], tuple(hands)
+
+    def names(self):
+        return [m.get("name", f"{m.get('feature', 'distance')}-{i}") for i, m in enumerate(self.mappings)]
@@ -0,0 +1,171 @@
+from collections.abc import Mapping
+import numpy as np
+
+MAX_HANDS = 2
+NUM_LANDMARKS = 21
+THUMB_TIP = 4
+INDEX_FINGER_TIP = 8
+WRIST = 0
+
+HANDEDNESS_CODES = {None: 0, "left": 1, "right": 2}
+HANDEDNESS_LABELS = {code: label for label, code in HANDEDNESS_CODES.items()}
+
+
+class HandView(Mapping):
+    """
+    Tampilan dict (hanya baca) untuk satu tangan di HandState, demi kompatibilitas dengan
+    kode yang membaca hand["thumb"], hand["index"], dan seterusnya.
+
+    Jarak ibu jari-telunjuk tidak lagi disediakan; nilai CC dihitung oleh GestureMapper.
+
+    Nilai dibaca langsung dari array HandState saat diakses, tanpa menyalin data per frame.
+    """
+
+    KEYS = ("thumb", "index", "wrist", "landmarks", "handedness", "frame_size")
+
+    def __init__(self, state, slot):
+        self._state = state
+        self._slot = slot
+
+    def __getitem__(self, key):
+        state, slot = self._state, self._slot
+        if key == "thumb":
+            return tuple(state.pixels[slot, THUMB_TIP].tolist())
+        if key == "index":
+            return tuple(state.pixels[slot, INDEX_FINGER_TIP].tolist())
+        if key == "wrist":
+            return tuple(state.pixels[slot, WRIST].tolist())
+        if key == "landmarks":
+            return state.pixels[slot]
+        if key == "handedness":
+            return HANDEDNESS_LABELS[int(state.handedness[slot])]
+        if key == "frame_size":
+            return state.frame_size
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self):
+        return len(self.KEYS)
+
+
+class HandState:
+    """
+    Status tangan satu frame dalam array NumPy yang dialokasikan sekali dan ditulis ulang di tempat.
+
+    Menyimpan landmark ternormalisasi, koordinat piksel, dan handedness untuk maksimal dua tangan. Berperilaku seperti list hands_data lama
+    (len, indeks, iterasi) dengan HandView sebagai elemen.
+    """
+
+    def __init__(self):
+        self.count = 0  # Jumlah tangan yang valid
+        self.frame_size = (0, 0)  # (lebar, tinggi) frame asal
+        self.landmarks = np.zeros((MAX_HANDS, NUM_LANDMARKS, 3), dtype=np.float32)  # x, y, z ternormalisasi
+        self.pixels = np.zeros((MAX_HANDS, NUM_LANDMARKS, 2), dtype=np.int32)  # Koordinat piksel
+        self.handedness = np.zeros(MAX_HANDS, dtype=np.uint8)  # Kode HANDEDNESS_CODES
+        self._scaled = np.zeros((MAX_HANDS, NUM_LANDMARKS, 2), dtype=np.float32)  # Buffer konversi piksel
+        self._views = [HandView(self, slot) for slot in range(MAX_HANDS)]
+
+    def update(self, count, frame_size):
+        """
+        Menghitung ulang koordinat piksel dari self.landmarks[:count] (sudah diisi pemanggil).
+        """
+        self.count = count = min(count, MAX_HANDS)
+        self.frame_size = frame_size
+        if not count:
+            return self
+        w, h = frame_size
+        # Konversi piksel tervektorisasi; dipotong ke nol seperti int() pada kode lama
+        np.multiply(self.landmarks[:count, :, :2], (w, h), out=self._scaled[:count])
+        np.copyto(self.pixels[:count], self._scaled[:count], casting="unsafe")
+        return self
+
+    def set_handedness(self, labels):
+        self.handedness[:] = 0
+        for slot, label in enumerate(labels[:MAX_HANDS]):
+            self.handedness[slot] = HANDEDNESS_CODES.get(label, 0)
+
+    def __len__(self):
+        return self.count
+
+    def __bool__(self):
+        return self.count > 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._views[i] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return self._views[index]
+
+    def __iter__(self):
+        return iter(self._views[:self.count])
+
+    def copy(self):
+        """
+        Salinan HandState yang tidak ikut ditimpa pool (untuk pembaca yang bisa tertahan lama).
+        """
+        state = HandState()
+        state.count = self.count
+        state.frame_size = self.frame_size
+        np.copyto(state.landmarks, self.landmarks)
+        np.copyto(state.pixels, self.pixels)
+        np.copyto(state.handedness, self.handedness)
+        return state
+
+    def to_dicts(self):
+        """
+        Salinan list of dict bergaya lama (misalnya untuk disimpan setelah frame berikutnya menimpa state).
+        """
+        return [dict(view) | {"landmarks": view["landmarks"].copy()} for view in self]
+
+    @classmethod
+    def from_dicts(cls, hands_data, frame_size=None):
+        """
+        Membangun HandState dari hands_data list of dict (jalur kompatibilitas, bukan jalur panas).
+        """
+        state = cls()
+        hands = list(hands_data)[:MAX_HANDS]
+        state.count = len(hands)
+        for slot, hand in enumerate(hands):
+            if "landmarks" in hand:
+                state.pixels[slot] = hand["landmarks"]
+            else:
+                state.pixels[slot, THUMB_TIP] = hand["thumb"]
+                state.pixels[slot, INDEX_FINGER_TIP] = hand["index"]
+                state.pixels[slot, WRIST] = hand.get("wrist", hand["thumb"])
+            state.handedness[slot] = HANDEDNESS_CODES.get(hand.get("handedness"), 0)
+            frame_size = frame_size or hand.get("frame_size")
+        state.frame_size = tuple(frame_size) if frame_size else (1, 1)
+        w, h = state.frame_size
+        state.landmarks[:state.count, :, :2] = state.pixels[:state.count] / (w, h)
+        return state
+
+
+def as_hand_state(hands_data):
+    """
+    Mengembalikan hands_data sebagai HandState (tanpa salinan jika sudah HandState).
+    """
+    return hands_data if isinstance(hands_data, HandState) else HandState.from_dicts(hands_data)
+
+
+class HandStatePool:
+    """
+    Cincin beberapa HandState yang dipakai bergiliran.
+
+    Tahap lain (MIDI, perekam) masih boleh membaca state frame sebelumnya sementara tracker
+    menulis frame baru, selama mereka selesai dalam size - 1 frame. Pool tidak memeriksa hal
+    ini; pembaca yang bisa tertahan lebih lama (render di thread utama) harus memakai copy().
+    """
+
+    def __init__(self, size=4):
+        self.states = [HandState() for _ in range(size)]
+        self._next = 0
+
+    def next(self):
+        state = self.states[self._next]
+        self._next = (self._next + 1) % len(self.states)
+        return state
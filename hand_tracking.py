@@ -1,108 +1,314 @@
+import time
 import cv2
 import mediapipe as mp
 import math
+import numpy as np
+from landmark_filter import create_filter
+from hand_state import HandStatePool, MAX_HANDS
+from logger import get_logger
+
+log = get_logger("tracking")
 
 class HandTracker:
-    def __init__(self):
+    def __init__(self, mode="full", detect_width=640, roi_padding=0.3, roi_max_size=320, redetect_interval=15,
+                 infer_every=1, infer_budget_ms=None, landmark_filter=None, mirrored=False, model_complexity=1,
+                 input_width=None):
         # Inisialisasi MediaPipe Hands
         self.mp_hands = mp.solutions.hands
         print("MediaPipe Hands berhasil diimpor!")  # Pesan debugging
 
         try:
             # Inisialisasi objek Hands dengan maksimal 2 tangan yang terdeteksi
-            self.hands = self.mp_hands.Hands(max_num_hands=2)
+            self.hands = self.mp_hands.Hands(max_num_hands=2, model_complexity=model_complexity)
             print(f"Atribut 'hands' berhasil diinisialisasi! Tipe: {type(self.hands)}")  # Pesan debugging
         except Exception as e:
             # Jika terjadi error, tampilkan pesan dan hentikan program
             print(f"Error saat inisialisasi 'hands': {e}")
             raise
 
-        # Inisialisasi utilitas menggambar landmark
-        self.mp_draw = mp.solutions.drawing_utils
+        # Mode inferensi: "full" (seluruh frame) atau "roi" (deteksi diperkecil + crop di sekitar tangan)
+        self.mode = mode
+        self.detect_width = detect_width  # Lebar frame untuk pencarian tangan di mode roi
+        self.roi_padding = roi_padding  # Padding crop relatif terhadap ukuran kotak tangan
+        self.roi_max_size = roi_max_size  # Sisi crop maksimum sebelum diperkecil
+        self.redetect_interval = redetect_interval  # Cari tangan baru tiap N frame jika belum 2 tangan
+        self.model_complexity = model_complexity  # Model landmark MediaPipe: 0 = ringan, 1 = penuh
+        self.input_width = input_width  # Lebar maksimum frame untuk inferensi mode full (None = apa adanya)
+        self._pending_quality = None  # Pengaturan dari set_quality(), diterapkan di thread tracking
+        self._models = {}  # model_complexity -> (Hands, Hands ROI) yang tidak sedang dipakai
+        self.roi_boxes = []  # Kotak (x0, y0, x1, y1) piksel dari tangan frame sebelumnya
+        self._frames_since_detect = 0
+        if mode == "roi":
+            # Satu instance Hands per slot tangan agar pelacakan temporal MediaPipe tetap stabil per crop
+            self.roi_hands = [self.mp_hands.Hands(max_num_hands=1, model_complexity=model_complexity) for _ in range(2)]
 
-        # Parameter untuk normalisasi dan smoothing
-        self.max_distance = 500  # Jarak maksimum untuk normalisasi
-        self.smoothed_speed = 127  # Nilai awal untuk smoothing eksponensial
-        self.alpha = 0.2  # Faktor smoothing (0 < alpha <= 1)
+        # Desimasi inferensi: MediaPipe hanya dijalankan tiap N frame dan/atau dalam anggaran waktu,
+        # di antaranya landmark diprediksi oleh filter ("one_euro" atau "kalman")
+        self.infer_every = infer_every  # Jalankan inferensi tiap N frame
+        self.infer_budget_ms = infer_budget_ms  # Rata-rata biaya inferensi per frame maksimum (ms)
+        self.landmark_filter_name = landmark_filter  # Filter pilihan pengguna (None = tanpa filter)
+        self.landmark_filter = None
+        self._filter_config = None  # (nama, desimasi) filter yang sedang dipakai
+        self._configure_filter()
+        self._landmarks = []  # Landmark tangan terakhir (protobuf, koordinat ternormalisasi)
+        self._handedness = []  # Label "left"/"right" untuk setiap tangan di self._landmarks
+        self._frames_since_infer = infer_every  # Paksa inferensi pada frame pertama
+        self._last_infer_ms = 0.0
+        self.inferences = 0  # Jumlah inferensi MediaPipe yang dijalankan
 
-    def calculate_distance(self, x1, y1, x2, y2):
-        # Menghitung jarak Euclidean antara dua titik (x1, y1) dan (x2, y2)
-        return math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
+        # State tangan per frame: array yang dialokasikan sekali, dipakai bergiliran
+        self._states = HandStatePool()
+
+        # MediaPipe mengasumsikan gambar selfie (dicerminkan); untuk frame kamera apa adanya labelnya ditukar
+        self.mirrored = mirrored
+
+    def warm_up(self, frame_size=(640, 480)):
+        """
+        Menjalankan inferensi pada frame kosong agar graf MediaPipe dan alokasinya sudah siap
+        sebelum frame kamera pertama. State pelacakan tidak berubah.
+        """
+        w, h = frame_size
+        dummy = np.zeros((h, w, 3), dtype=np.uint8)
+        self.hands.process(dummy)
+        if self.mode == "roi":
+            side = min(self.roi_max_size, w, h)
+            for hands in self.roi_hands:
+                hands.process(dummy[:side, :side])
+
+    def set_quality(self, input_width=None, model_complexity=None, infer_every=None):
+        """
+        Meminta perubahan kualitas inferensi dari thread lain (misalnya QualityGovernor).
+
+        input_width berlaku untuk frame mode full dan pencarian tangan mode roi. Perubahan
+        diterapkan di awal track_hands() berikutnya agar objek Hands tidak diganti di tengah inferensi.
+        """
+        self._pending_quality = (input_width, model_complexity, infer_every)
+
+    def _apply_quality(self):
+        input_width, model_complexity, infer_every = self._pending_quality
+        self._pending_quality = None
+        if self.mode == "roi":
+            self.detect_width = input_width or self.detect_width
+        else:
+            self.input_width = input_width
+        if infer_every:
+            self.infer_every = infer_every
+            self._configure_filter()
+        if model_complexity is not None and model_complexity != self.model_complexity:
+            # Ganti model MediaPipe. Model lama disimpan, bukan ditutup: membangun graf Hands adalah
+            # operasi termahal, dan level kualitas bisa kembali ke model ini nanti
+            self._models[self.model_complexity] = (self.hands, self.roi_hands if self.mode == "roi" else None)
+            self.model_complexity = model_complexity
+            if model_complexity in self._models:
+                self.hands, roi_hands = self._models.pop(model_complexity)
+            else:
+                self.hands = self.mp_hands.Hands(max_num_hands=2, model_complexity=model_complexity)
+                roi_hands = None
+                if self.mode == "roi":
+                    roi_hands = [self.mp_hands.Hands(max_num_hands=1, model_complexity=model_complexity)
+                                 for _ in range(2)]
+            if self.mode == "roi":
+                self.roi_hands = roi_hands
+        log.info("Kualitas tracking: lebar input {width}, model_complexity {complexity}, inferensi tiap {interval} frame",
+                 width=input_width or "penuh", complexity=self.model_complexity, interval=self.infer_every)
+
+    def _configure_filter(self):
+        # Parameter filter mengikuti desimasi saat ini. Saat desimasi aktif tanpa filter pilihan
+        # pengguna, One-Euro dipakai sementara (tanpa filter landmark hanya membeku di antara
+        # inferensi) dan dilepas lagi saat inferensi kembali tiap frame.
+        decimated = self.infer_every > 1 or bool(self.infer_budget_ms)
+        name = self.landmark_filter_name or ("one_euro" if decimated else None)
+        if (name, decimated) != self._filter_config:
+            self._filter_config = (name, decimated)
+            self.landmark_filter = create_filter(name, decimated)
+
+    def hand_label(self, handedness):
+        """
+        Mengubah klasifikasi handedness MediaPipe menjadi "left"/"right" dari sudut pandang pemain.
+        """
+        label = handedness.classification[0].label.lower()
+        if not self.mirrored:
+            label = "left" if label == "right" else "right"
+        return label
+
+    def detect_full(self, frame, max_width=None, labels=None):
+        """
+        Mendeteksi tangan pada seluruh frame (opsional diperkecil ke max_width).
+
+        Landmark ternormalisasi terhadap frame, sehingga hasilnya sama untuk frame asli.
+        Jika labels berupa list, label handedness setiap tangan ditambahkan ke dalamnya.
+        """
+        h, w = frame.shape[:2]
+        if max_width and w > max_width:
+            # Perkecil dulu baru konversi warna agar konversi juga lebih murah
+            frame = cv2.resize(frame, (max_width, int(h * max_width / w)), interpolation=cv2.INTER_AREA)
 
-    def track_hands(self, frame):
         # Konversi frame dari BGR ke RGB (MediaPipe memerlukan format RGB)
         rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        results = self.hands.process(rgb_frame)
+        if labels is not None:
+            labels.extend(self.hand_label(handedness) for handedness in results.multi_handedness or [])
+        return list(results.multi_hand_landmarks or [])
 
-        # Pastikan atribut 'hands' sudah terinisialisasi
-        if not hasattr(self, 'hands'):
-            print("Error: Atribut 'hands' tidak terinisialisasi!")
-            return [], 127  # Kembalikan data kosong dan nilai speed default
+    def landmark_box(self, hand_landmarks, w, h):
+        """
+        Menghitung kotak crop persegi (piksel) di sekitar landmark dengan padding.
+        """
+        xs = [lm.x * w for lm in hand_landmarks.landmark]
+        ys = [lm.y * h for lm in hand_landmarks.landmark]
+        cx, cy = (min(xs) + max(xs)) / 2, (min(ys) + max(ys)) / 2
+        half = max(max(xs) - min(xs), max(ys) - min(ys)) * (0.5 + self.roi_padding)
+        x0, y0 = max(0, int(cx - half)), max(0, int(cy - half))
+        x1, y1 = min(w, int(cx + half)), min(h, int(cy + half))
+        return x0, y0, x1, y1
 
-        # Proses frame untuk mendeteksi tangan
-        results = self.hands.process(rgb_frame)
-        hands_data = []  # List untuk menyimpan data tangan yang terdeteksi
+    def track_roi(self, frame, box, hands, labels=None):
+        """
+        Menjalankan inferensi landmark hanya pada crop di sekitar tangan sebelumnya.
 
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                # Ambil landmark untuk ujung ibu jari, ujung telunjuk, dan pergelangan tangan
-                thumb_tip = hand_landmarks.landmark[self.mp_hands.HandLandmark.THUMB_TIP]
-                index_finger_tip = hand_landmarks.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_TIP]
-                wrist = hand_landmarks.landmark[self.mp_hands.HandLandmark.WRIST]
+        Landmark dikembalikan ke koordinat ternormalisasi frame penuh, atau None jika tangan hilang.
+        """
+        h, w = frame.shape[:2]
+        x0, y0, x1, y1 = box
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            return None
+        crop = frame[y0:y1, x0:x1]
+        side = max(crop.shape[:2])
+        if side > self.roi_max_size:
+            # Crop besar (kamera 1080p) diperkecil agar biaya inferensi tidak ikut resolusi
+            scale = self.roi_max_size / side
+            crop = cv2.resize(crop, (max(1, int(crop.shape[1] * scale)), max(1, int(crop.shape[0] * scale))), interpolation=cv2.INTER_AREA)
 
-                # Dapatkan dimensi frame
-                h, w, _ = frame.shape
+        results = hands.process(cv2.cvtColor(crop, cv2.COLOR_BGR2RGB))
+        if not results.multi_hand_landmarks:
+            return None
 
-                # Konversi koordinat landmark ke piksel
-                thumb_x, thumb_y = int(thumb_tip.x * w), int(thumb_tip.y * h)
-                index_x, index_y = int(index_finger_tip.x * w), int(index_finger_tip.y * h)
-                wrist_x, wrist_y = int(wrist.x * w), int(wrist.y * h)
+        # Petakan landmark crop kembali ke koordinat frame penuh (diubah langsung pada protobuf)
+        hand_landmarks = results.multi_hand_landmarks[0]
+        if labels is not None:
+            labels.append(self.hand_label(results.multi_handedness[0]))
+        for lm in hand_landmarks.landmark:
+            lm.x = (x0 + lm.x * (x1 - x0)) / w
+            lm.y = (y0 + lm.y * (y1 - y0)) / h
+        return hand_landmarks
 
-                # Hitung jarak antara ujung ibu jari dan ujung telunjuk
-                distance_thumb_index = self.calculate_distance(thumb_x, thumb_y, index_x, index_y)
+    def find_hand_landmarks(self, frame):
+        """
+        Mengembalikan (daftar landmark tangan, daftar label handedness) sesuai mode inferensi.
+        """
+        labels = []
+        if self.mode != "roi":
+            return self.detect_full(frame, self.input_width, labels=labels), labels
 
-                # Normalisasi jarak ke rentang 0-127
-                normalized_distance = min(int((distance_thumb_index / self.max_distance) * 127 * 4), 127)
+        h, w = frame.shape[:2]
+        landmarks_list = []
+        if self.roi_boxes:
+            for box, hands in zip(self.roi_boxes, self.roi_hands):
+                hand_landmarks = self.track_roi(frame, box, hands, labels)
+                if hand_landmarks is None:
+                    # Tangan hilang: kembali ke pencarian seluruh frame
+                    landmarks_list, labels = [], []
+                    break
+                landmarks_list.append(hand_landmarks)
 
-                # Simpan data tangan ke dalam list
-                hands_data.append({
-                    "thumb": (thumb_x, thumb_y),  # Koordinat ujung ibu jari
-                    "index": (index_x, index_y),  # Koordinat ujung telunjuk
-                    "wrist": (wrist_x, wrist_y),  # Koordinat pergelangan tangan
-                    "distance": normalized_distance  # Jarak normalisasi
-                })
+        self._frames_since_detect += 1
+        need_detect = not landmarks_list or (
+            len(landmarks_list) < 2 and self._frames_since_detect >= self.redetect_interval)
+        if need_detect:
+            detected_labels = []
+            detected = self.detect_full(frame, self.detect_width, detected_labels)
+            self._frames_since_detect = 0
+            if len(detected) >= len(landmarks_list):
+                landmarks_list, labels = detected, detected_labels
 
-                # Gambar landmark dan koneksi tangan pada frame
-                self.mp_draw.draw_landmarks(frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
+        self.roi_boxes = [self.landmark_box(hand_landmarks, w, h) for hand_landmarks in landmarks_list]
+        return landmarks_list, labels
 
-            # Hitung nilai speed jika dua tangan terdeteksi
-            speed_value = self.smoothed_speed  # Nilai default jika hanya satu tangan
-            if len(results.multi_hand_landmarks) == 2:
-                # Ambil landmark ujung ibu jari dari kedua tangan
-                hand1_thumb = results.multi_hand_landmarks[0].landmark[self.mp_hands.HandLandmark.THUMB_TIP]
-                hand2_thumb = results.multi_hand_landmarks[1].landmark[self.mp_hands.HandLandmark.THUMB_TIP]
+    def should_infer(self):
+        """
+        Menentukan apakah frame ini menjalankan MediaPipe atau cukup memakai prediksi filter.
+        """
+        if self.landmark_filter is None and self.infer_every <= 1 and not self.infer_budget_ms:
+            return True
+        if self._frames_since_infer < self.infer_every:
+            return False
+        if self.infer_budget_ms and self._frames_since_infer * self.infer_budget_ms < self._last_infer_ms:
+            # Biaya inferensi terakhir dibagi ke beberapa frame agar rata-ratanya dalam anggaran
+            return False
+        return True
 
-                # Konversi koordinat landmark ke piksel
-                hand1_thumb_x, hand1_thumb_y = int(hand1_thumb.x * w), int(hand1_thumb.y * h)
-                hand2_thumb_x, hand2_thumb_y = int(hand2_thumb.x * w), int(hand2_thumb.y * h)
+    def match_previous_order(self, landmarks_list, labels):
+        """
+        Menyusun ulang dua tangan (beserta labelnya) agar urutannya sama dengan frame sebelumnya (berdasarkan pergelangan).
+        """
+        if len(landmarks_list) != 2 or len(self._landmarks) != 2:
+            return landmarks_list, labels
+        wrist = self.mp_hands.HandLandmark.WRIST
+        prev = [(hl.landmark[wrist].x, hl.landmark[wrist].y) for hl in self._landmarks]
+        new = [(hl.landmark[wrist].x, hl.landmark[wrist].y) for hl in landmarks_list]
+        straight = math.dist(prev[0], new[0]) + math.dist(prev[1], new[1])
+        swapped = math.dist(prev[0], new[1]) + math.dist(prev[1], new[0])
+        if swapped < straight:
+            return landmarks_list[::-1], labels[::-1]
+        return landmarks_list, labels
 
-                # Hitung jarak antara kedua ujung ibu jari
-                distance_between_thumbs = self.calculate_distance(hand1_thumb_x, hand1_thumb_y, hand2_thumb_x, hand2_thumb_y)
+    def update_landmarks(self, frame):
+        """
+        Menjalankan inferensi atau prediksi dan mengembalikan landmark tangan untuk frame ini.
+        """
+        now = time.perf_counter()
+        if self.should_infer():
+            # Proses frame untuk mendeteksi tangan (seluruh frame atau crop ROI)
+            landmarks_list, labels = self.match_previous_order(*self.find_hand_landmarks(frame))
+            self._last_infer_ms = (time.perf_counter() - now) * 1000.0
+            self._frames_since_infer = 1
+            self.inferences += 1
+            self._landmarks = landmarks_list
+            self._handedness = labels
+            if self.landmark_filter is None or not landmarks_list:
+                return landmarks_list
+            points = self.landmark_filter.update(self.landmarks_to_array(landmarks_list), now)
+        else:
+            self._frames_since_infer += 1
+            if self.landmark_filter is None or not self._landmarks:
+                return self._landmarks  # Tahan landmark terakhir
+            points = self.landmark_filter.predict(now)
 
-                # Debugging: Tampilkan jarak antara kedua ibu jari
-                print(f"Jarak Antara Ibu Jari: {distance_between_thumbs}")
+        # Tulis posisi terfilter/prediksi kembali ke protobuf agar penggambaran tetap sama
+        for hand_landmarks, hand_points in zip(self._landmarks, points):
+            for lm, (x, y) in zip(hand_landmarks.landmark, hand_points):
+                lm.x, lm.y = x, y
+        return self._landmarks
 
-                # Hitung nilai speed berdasarkan jarak antara ibu jari
-                max_speed_distance = 500  # Jarak maksimum untuk normalisasi speed
-                normalized_speed = int((1 - distance_between_thumbs / max_speed_distance) * 60)  # Faktor pengali 60
-                speed_value = max(0, min(127, normalized_speed))  # Batasi nilai speed antara 0 dan 127
+    @staticmethod
+    def landmarks_to_array(landmarks_list):
+        # Salin koordinat (x, y) semua landmark ke array (jumlah_tangan, 21, 2)
+        return np.array([[(lm.x, lm.y) for lm in hl.landmark] for hl in landmarks_list], dtype=np.float64)
 
-                # Smoothing eksponensial untuk menghaluskan perubahan speed
-                self.smoothed_speed = int(self.alpha * speed_value + (1 - self.alpha) * self.smoothed_speed)
-                speed_value = self.smoothed_speed
+    def track_hands(self, frame):
+        """
+        Mendeteksi tangan dan mengembalikan HandState.
+
+        HandState diambil dari pool dan ditulis di tempat; bisa dibaca seperti list hands_data lama.
+        Nilai CC (termasuk speed CC 22) dihitung oleh GestureMapper dari landmark, bukan di sini.
+        """
+        state = self._states.next()
+        if self._pending_quality is not None:
+            self._apply_quality()
 
-                # Debugging: Tampilkan nilai speed
-                print(f"Nilai Speed: {speed_value}")
+        # Pastikan atribut 'hands' sudah terinisialisasi
+        if not hasattr(self, 'hands'):
+            log.error("Atribut 'hands' tidak terinisialisasi!", rate_limit=1.0)
+            return state.update(0, (frame.shape[1], frame.shape[0]))
 
-            return hands_data, speed_value  # Kembalikan data tangan dan nilai speed
+        # Deteksi tangan (atau prediksi di antara inferensi jika desimasi aktif)
+        multi_hand_landmarks = self.update_landmarks(frame)
+        h, w = frame.shape[:2]
 
-        return [], 127  # Kembalikan data kosong dan nilai speed default jika tidak ada tangan terdeteksi
\ No newline at end of file
+        # Salin landmark ke array state, lalu konversi piksel sekaligus
+        count = min(len(multi_hand_landmarks), MAX_HANDS)
+        for slot in range(count):
+            state.landmarks[slot] = [(lm.x, lm.y, lm.z) for lm in multi_hand_landmarks[slot].landmark]
+        state.update(count, (w, h))
+        state.set_handedness(self._handedness)
+        return state
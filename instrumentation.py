@@ -0,0 +1,183 @@
+import csv
+import json
+import math
+import threading
+import time
+import cv2
+import numpy as np
+
+
+class LatencyHistogram:
+    """
+    Histogram latensi bergaya HDR: bucket logaritmik dengan galat relatif tetap.
+
+    Merekam satu nilai hanya butuh satu log dan satu increment, sehingga murah di jalur panas.
+    """
+
+    def __init__(self, min_value=1e-6, max_value=10.0, precision=0.02):
+        self.min_value = min_value  # Nilai terkecil yang dibedakan (detik)
+        self.log_ratio = math.log(1.0 + precision)  # Lebar bucket dalam skala log
+        self.num_buckets = int(math.ceil(math.log(max_value / min_value) / self.log_ratio)) + 2
+        self.counts = np.zeros(self.num_buckets, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value):
+        if value <= self.min_value:
+            index = 0
+        else:
+            index = min(int(math.log(value / self.min_value) / self.log_ratio) + 1, self.num_buckets - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        self.counts += other.counts
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def reset(self):
+        self.counts[:] = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def percentile(self, q):
+        """
+        Mengembalikan batas atas bucket yang memuat persentil q (detik).
+        """
+        if self.count == 0:
+            return 0.0
+        index = int(np.searchsorted(np.cumsum(self.counts), q / 100.0 * self.count))
+        return min(self.min_value * math.exp(index * self.log_ratio), self.max)
+
+    def summary(self):
+        """
+        Ringkasan dalam milidetik: jumlah, rata-rata, p50, p95, p99, dan maksimum.
+        """
+        return {
+            "count": self.count,
+            "mean_ms": self.total * 1000.0 / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(50) * 1000.0,
+            "p95_ms": self.percentile(95) * 1000.0,
+            "p99_ms": self.percentile(99) * 1000.0,
+            "max_ms": self.max * 1000.0,
+        }
+
+
+class Instrumentation:
+    """
+    Pencatat latensi per tahap pipeline (capture, inferensi, MIDI, audio, render, tampilan)
+    dan latensi ujung-ke-ujung capture -> CC.
+
+    Setiap tahap punya histogram total dan histogram bergulir (dua jendela terakhir).
+    Saat dinonaktifkan, record() langsung kembali sehingga overhead-nya hanya satu pemeriksaan.
+    """
+
+    STAGES = ("capture", "inference", "midi", "audio", "render", "display", "capture_to_cc", "capture_to_display")
+
+    def __init__(self, enabled=False, overlay=False, window_seconds=5.0, dump_path=None):
+        self.enabled = enabled  # Aktifkan pencatatan
+        self.overlay = overlay  # Tampilkan tabel latensi di frame
+        self.window_seconds = window_seconds  # Panjang jendela histogram bergulir
+        self.dump_path = dump_path  # File CSV/JSON untuk hasil saat keluar
+        self._lock = threading.Lock()
+        self.totals = {}  # Tahap -> histogram sejak awal
+        self._current = {}  # Tahap -> histogram jendela berjalan
+        self._previous = {}  # Tahap -> histogram jendela sebelumnya
+        self._window_start = time.perf_counter()
+
+    def record(self, stage, seconds):
+        """
+        Mencatat durasi (detik) untuk satu tahap.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            total = self.totals.get(stage)
+            if total is None:
+                total = self.totals[stage] = LatencyHistogram()
+                self._current[stage] = LatencyHistogram()
+            total.record(seconds)
+            self._current[stage].record(seconds)
+
+    def record_since(self, stage, start):
+        """
+        Mencatat waktu yang berlalu sejak start (perf_counter).
+        """
+        if self.enabled:
+            self.record(stage, time.perf_counter() - start)
+
+    def on_midi_send(self, control, value, origin, channel=None):
+        # Hook untuk MidiOutputEngine: latensi dari capture frame sampai CC dikirim
+        if self.enabled and origin is not None:
+            self.record("capture_to_cc", time.perf_counter() - origin)
+
+    def rolling_summary(self):
+        """
+        Ringkasan per tahap untuk dua jendela terakhir (data yang ditampilkan di overlay).
+        """
+        with self._lock:
+            now = time.perf_counter()
+            if now - self._window_start >= self.window_seconds:
+                # Geser jendela: jendela berjalan menjadi jendela sebelumnya
+                self._previous, self._current = self._current, self._previous
+                for stage, hist in self.totals.items():
+                    if stage not in self._current:
+                        self._current[stage] = LatencyHistogram()
+                    self._current[stage].reset()
+                self._window_start = now
+
+            summary = {}
+            for stage in self.totals:
+                merged = LatencyHistogram()
+                merged.merge(self._current[stage])
+                if stage in self._previous:
+                    merged.merge(self._previous[stage])
+                summary[stage] = merged.summary()
+        return summary
+
+    def total_summary(self):
+        with self._lock:
+            return {stage: hist.summary() for stage, hist in self.totals.items()}
+
+    def draw_overlay(self, frame, origin=(10, 20), line_height=16):
+        """
+        Menggambar tabel p50/p95/p99 per tahap di pojok frame.
+        """
+        if not (self.enabled and self.overlay):
+            return frame
+        x, y = origin
+        summary = self.rolling_summary()
+        for stage in self.STAGES:
+            stats = summary.get(stage)
+            if stats is None:
+                continue
+            text = f"{stage:<18} p50 {stats['p50_ms']:6.1f}  p95 {stats['p95_ms']:6.1f}  p99 {stats['p99_ms']:6.1f} ms"
+            cv2.putText(frame, text, (x, y), cv2.FONT_HERSHEY_PLAIN, 1.0, (0, 255, 0), 1, cv2.LINE_AA)
+            y += line_height
+        return frame
+
+    def dump(self, path=None):
+        """
+        Menyimpan ringkasan total ke CSV atau JSON (ditentukan dari ekstensi file).
+        """
+        path = path or self.dump_path
+        if not self.enabled or not path:
+            return
+        summary = self.total_summary()
+        if path.endswith(".json"):
+            with open(path, "w") as f:
+                json.dump(summary, f, indent=2)
+        else:
+            with open(path, "w", newline="") as f:
+                fields = ["count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+                writer = csv.writer(f)
+                writer.writerow(["stage"] + fields)
+                for stage, stats in summary.items():
+                    writer.writerow([stage] + [round(stats[field], 4) if field != "count" else stats[field] for field in fields])
+        print(f"Statistik latensi disimpan ke '{path}'.")
@@ -0,0 +1,141 @@
+import math
+import numpy as np
+
+# Parameter One-Euro (min_cutoff, beta, d_cutoff) untuk koordinat ternormalisasi 0-1, dari
+# "python benchmark.py filters". Inferensi tiap frame: penghalusan ringan yang galatnya saat
+# bergerak tetap dekat data mentah. Desimasi: penghalusan lebih kuat, karena prediksi di antara
+# inferensi mengekstrapolasi turunan dan turunan yang berderau membuat prediksi melompat.
+ONE_EURO_EVERY_FRAME = (1.0, 200.0, 6.0)
+ONE_EURO_DECIMATED = (0.5, 20.0, 10.0)
+
+
+class OneEuroFilter:
+    """
+    Filter One-Euro yang divektorisasi untuk semua koordinat landmark sekaligus.
+
+    Cutoff naik mengikuti kecepatan: saat tangan diam jitter ditekan kuat, saat
+    bergerak cepat lag tetap kecil. Di antara inferensi, posisi diprediksi dengan
+    mengekstrapolasi turunan yang sudah difilter.
+
+    Parameter bawaan (ONE_EURO_EVERY_FRAME) disetel untuk koordinat ternormalisasi 0-1:
+    kecepatan tangan biasanya 0,2-2 satuan/detik, sehingga beta harus besar agar cutoff
+    benar-benar naik. Untuk desimasi inferensi pakai ONE_EURO_DECIMATED.
+    """
+
+    def __init__(self, min_cutoff=ONE_EURO_EVERY_FRAME[0], beta=ONE_EURO_EVERY_FRAME[1],
+                 d_cutoff=ONE_EURO_EVERY_FRAME[2]):
+        self.min_cutoff = min_cutoff  # Cutoff minimum (Hz) saat diam
+        self.beta = beta  # Seberapa cepat cutoff naik mengikuti kecepatan
+        self.d_cutoff = d_cutoff  # Cutoff (Hz) untuk turunan
+        self.x = None  # Posisi terfilter terakhir
+        self.dx = None  # Turunan terfilter terakhir (satuan/detik)
+        self.t = None  # Waktu update terakhir
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def reset(self, x, t):
+        self.x = np.array(x, dtype=np.float64)
+        self.dx = np.zeros_like(self.x)
+        self.t = t
+        return self.x
+
+    def update(self, x, t):
+        """
+        Memasukkan pengukuran baru dan mengembalikan posisi terfilter.
+        """
+        if self.x is None or np.shape(x) != self.x.shape:
+            return self.reset(x, t)
+        dt = max(t - self.t, 1e-6)
+        dx = (x - self.x) / dt
+        self.dx += self._alpha(self.d_cutoff, dt) * (dx - self.dx)
+        cutoff = self.min_cutoff + self.beta * np.abs(self.dx)
+        self.x += self._alpha(cutoff, dt) * (x - self.x)
+        self.t = t
+        return self.x
+
+    def predict(self, t):
+        """
+        Memprediksi posisi pada waktu t tanpa mengubah state filter.
+        """
+        return self.x + self.dx * (t - self.t)
+
+
+class ConstantVelocityFilter:
+    """
+    Filter Kalman kecepatan-konstan per koordinat, divektorisasi dengan NumPy.
+
+    Setiap koordinat punya state [posisi, kecepatan] dan kovarians 2x2 sendiri;
+    semua disimpan sebagai array sehingga update seluruh landmark cukup beberapa operasi array.
+    """
+
+    def __init__(self, process_noise=50.0, measurement_noise=1e-5):
+        self.q = process_noise  # Kerapatan spektral derau percepatan
+        self.r = measurement_noise  # Varians derau pengukuran
+        self.x = None  # Posisi
+        self.v = None  # Kecepatan
+        self.t = None
+
+    def reset(self, x, t):
+        self.x = np.array(x, dtype=np.float64)
+        self.v = np.zeros_like(self.x)
+        # Kovarians awal: posisi sebesar derau ukur, kecepatan belum diketahui
+        self.p00 = np.full_like(self.x, self.r)
+        self.p01 = np.zeros_like(self.x)
+        self.p11 = np.full_like(self.x, 1.0)
+        self.t = t
+        return self.x
+
+    def update(self, x, t):
+        """
+        Langkah prediksi sampai waktu t lalu koreksi dengan pengukuran x.
+        """
+        if self.x is None or np.shape(x) != self.x.shape:
+            return self.reset(x, t)
+        dt = max(t - self.t, 1e-6)
+
+        # Prediksi state dan kovarians (model percepatan acak)
+        self.x += self.v * dt
+        q = self.q
+        p00 = self.p00 + dt * (2 * self.p01 + dt * self.p11) + q * dt ** 3 / 3
+        p01 = self.p01 + dt * self.p11 + q * dt ** 2 / 2
+        p11 = self.p11 + q * dt
+
+        # Koreksi dengan pengukuran posisi
+        gain_x = p00 / (p00 + self.r)
+        gain_v = p01 / (p00 + self.r)
+        residual = x - self.x
+        self.x += gain_x * residual
+        self.v += gain_v * residual
+        self.p00 = (1 - gain_x) * p00
+        self.p01 = (1 - gain_x) * p01
+        self.p11 = p11 - gain_v * p01
+        self.t = t
+        return self.x
+
+    def predict(self, t):
+        """
+        Memprediksi posisi pada waktu t tanpa mengubah state filter.
+        """
+        return self.x + self.v * (t - self.t)
+
+
+# Nama filter yang dikenal create_filter (pilihan --landmark-filter)
+FILTER_NAMES = ("one_euro", "kalman")
+
+
+def create_filter(name, decimated=False):
+    """
+    Membuat filter landmark dari nama ("one_euro" atau "kalman"), atau None.
+
+    decimated=True memilih parameter untuk prediksi di antara inferensi (infer_every > 1).
+    """
+    if name is None:
+        return None
+    if name == "one_euro":
+        return OneEuroFilter(*(ONE_EURO_DECIMATED if decimated else ONE_EURO_EVERY_FRAME))
+    if name == "kalman":
+        return ConstantVelocityFilter()
+    raise ValueError(f"Filter landmark tidak dikenal: {name}")
@@ -0,0 +1,201 @@
+import atexit
+import collections
+import json
+import sys
+import threading
+import time
+
+DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+LEVELS = {name.lower(): level for level, name in LEVEL_NAMES.items()}
+
+
+class AsyncLogger:
+    """
+    Logger asinkron untuk jalur panas.
+
+    Pemanggil hanya memeriksa level, memeriksa batas laju per pesan, lalu menambahkan tuple
+    ke deque berkapasitas tetap (append/popleft atomik di CPython, tanpa kunci). Pemformatan
+    teks, penulisan ke konsol, dan sink JSONL dilakukan oleh satu thread latar belakang
+    yang menguras buffer secara berkala. Jika buffer penuh, record tertua dibuang.
+    """
+
+    def __init__(self, level=INFO, capacity=8192, console=True, jsonl_path=None, flush_interval=0.05):
+        self.level = level  # Level minimum yang dicatat
+        self.capacity = capacity  # Jumlah record maksimum di ring buffer
+        self.console = console  # Tulis ke stdout
+        self.jsonl_path = jsonl_path  # File JSONL untuk analisis (opsional)
+        self.flush_interval = flush_interval  # Jeda antar pengurasan buffer (detik)
+
+        self._buffer = collections.deque(maxlen=capacity)
+        self._last_emit = {}  # (nama, pesan) -> waktu record terakhir yang lolos batas laju
+        self._suppressed = {}  # (nama, pesan) -> jumlah record yang ditahan batas laju
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._jsonl = None
+
+        # Statistik
+        self.emitted = 0  # Record yang sudah ditulis
+        self.dropped = 0  # Record yang tertimpa karena buffer penuh
+        self.suppressed = 0  # Record yang ditahan batas laju
+
+    def enabled_for(self, level):
+        return level >= self.level
+
+    def log(self, level, name, message, *, rate_limit=None, **fields):
+        """
+        Mencatat satu record. message diformat dengan fields (str.format) oleh thread penguras.
+
+        rate_limit (keyword saja) membatasi pesan yang sama (nama + teks pesan) paling sering
+        sekali per rate_limit detik; jumlah yang ditahan dilaporkan bersama record berikutnya yang lolos.
+        """
+        if level < self.level:
+            return
+        now = time.perf_counter()
+        key = (name, message)
+        suppressed = 0
+        if rate_limit:
+            last = self._last_emit.get(key)
+            if last is not None and now - last < rate_limit:
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                self.suppressed += 1
+                return
+            self._last_emit[key] = now
+            suppressed = self._suppressed.pop(key, 0)
+
+        if len(self._buffer) >= self.capacity:
+            self.dropped += 1
+        self._buffer.append((time.time(), level, name, message, fields, suppressed))
+        if self._thread is None:
+            self._start()
+        if level >= ERROR:
+            self._wake.set()  # Error ditulis secepatnya
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            if self.jsonl_path:
+                self._jsonl = open(self.jsonl_path, "a", encoding="utf-8")
+            self._thread = threading.Thread(target=self._drain_loop, name="log-drain", daemon=True)
+            self._thread.start()
+
+    def _drain_loop(self):
+        while not self._stop_event.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.drain()
+        self.drain()
+
+    def drain(self):
+        """
+        Menulis semua record yang ada di buffer ke sink (dipanggil oleh thread penguras).
+        """
+        lines = []
+        records = []
+        while True:
+            try:
+                wall, level, name, message, fields, suppressed = self._buffer.popleft()
+            except IndexError:
+                break
+            try:
+                text = message.format(**fields) if fields else message
+            except (KeyError, IndexError, ValueError) as e:
+                text = f"{message} (format gagal: {e})"
+            if suppressed:
+                text += f" (+{suppressed} pesan serupa ditahan)"
+            if self.console:
+                lines.append(f"[{LEVEL_NAMES.get(level, level)}] {name}: {text}\n")
+            if self._jsonl is not None:
+                record = {"t": wall, "level": LEVEL_NAMES.get(level, level), "logger": name, "msg": text}
+                if fields:
+                    record["fields"] = fields
+                if suppressed:
+                    record["suppressed"] = suppressed
+                records.append(json.dumps(record, default=str) + "\n")
+            self.emitted += 1
+
+        # Satu penulisan per sink untuk seluruh batch
+        if lines:
+            sys.stdout.write("".join(lines))
+            sys.stdout.flush()
+        if records:
+            self._jsonl.write("".join(records))
+            self._jsonl.flush()
+
+    def stats(self):
+        return {"emitted": self.emitted, "dropped": self.dropped, "suppressed": self.suppressed,
+                "pending": len(self._buffer)}
+
+    def close(self):
+        """
+        Menguras sisa record lalu menghentikan thread dan menutup sink JSONL.
+        """
+        self._stop_event.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+        else:
+            self.drain()
+        if self._jsonl is not None:
+            self._jsonl.close()
+            self._jsonl = None
+
+
+class Logger:
+    """
+    Logger bernama yang meneruskan record ke AsyncLogger global.
+
+    Field tidak boleh bernama level, name, message, atau rate_limit (lihat AsyncLogger.log).
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def enabled_for(self, level):
+        return _root.enabled_for(level)
+
+    def debug(self, message, *, rate_limit=None, **fields):
+        if DEBUG >= _root.level:
+            _root.log(DEBUG, self.name, message, rate_limit=rate_limit, **fields)
+
+    def info(self, message, *, rate_limit=None, **fields):
+        if INFO >= _root.level:
+            _root.log(INFO, self.name, message, rate_limit=rate_limit, **fields)
+
+    def warning(self, message, *, rate_limit=None, **fields):
+        if WARNING >= _root.level:
+            _root.log(WARNING, self.name, message, rate_limit=rate_limit, **fields)
+
+    def error(self, message, *, rate_limit=None, **fields):
+        if ERROR >= _root.level:
+            _root.log(ERROR, self.name, message, rate_limit=rate_limit, **fields)
+
+
+_root = AsyncLogger()
+
+
+def get_logger(name):
+    return Logger(name)
+
+
+def configure(level=INFO, console=True, jsonl_path=None, capacity=8192):
+    """
+    Mengganti logger global (level sebagai angka atau nama "debug"/"info"/"warning"/"error").
+    """
+    global _root
+    if isinstance(level, str):
+        level = LEVELS[level.lower()]
+    _root.close()
+    _root = AsyncLogger(level=level, capacity=capacity, console=console, jsonl_path=jsonl_path)
+    return _root
+
+
+def shutdown():
+    _root.close()
+
+
+atexit.register(shutdown)
@@ -1,57 +1,179 @@
+import argparse
 import cv2
-from hand_tracking import HandTracker
-from midi_control import MidiController
-from visualizer import Visualizer
-from audio_capture import AudioCapture
+from pipeline import Pipeline
+from camera import CameraCapture, FOURCC_CODES
+from instrumentation import Instrumentation
+from recording import Recorder, Replayer
+from supervisor import Supervisor, parse_source_spec
+from gesture_mapping import load_mappings
+from startup import StartupReport
+from quality import QualityGovernor
+from landmark_filter import FILTER_NAMES
+import logger
+
+log = logger.get_logger("main")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="FL Studio Visual Control")
+    parser.add_argument("--stats", action="store_true", help="Catat latensi per tahap dan tampilkan di frame")
+    parser.add_argument("--stats-file", help="Simpan statistik latensi ke file CSV/JSON saat keluar")
+    parser.add_argument("--record", help="Rekam landmark dan event CC ke <nama>_frames.npy/_events.npy")
+    parser.add_argument("--replay", help="Putar ulang rekaman ke MIDI dan visualisasi tanpa kamera/MediaPipe")
+    parser.add_argument("--replay-fast", action="store_true", help="Putar ulang secepat mungkin, bukan waktu nyata")
+    parser.add_argument("--headless", action="store_true",
+                        help="Hanya kontrol MIDI: tanpa jendela, gambar, spektrum, maupun perangkat audio")
+    parser.add_argument("--mapping", help="File JSON pemetaan gestur -> CC/not (bawaan: volume, EQ, speed)")
+    parser.add_argument("--log-level", default="info", choices=["debug", "info", "warning", "error"],
+                        help="Level log minimum (debug menampilkan fitur audio, dibatasi lajunya)")
+    parser.add_argument("--log-file", help="Simpan log terstruktur ke file JSONL")
+    parser.add_argument("--camera", default="0", help="Indeks kamera atau path file video (untuk uji tanpa kamera)")
+    parser.add_argument("--width", type=int, help="Lebar frame kamera yang diminta")
+    parser.add_argument("--height", type=int, help="Tinggi frame kamera yang diminta")
+    parser.add_argument("--fps", type=float, help="FPS kamera yang diminta")
+    parser.add_argument("--fourcc", choices=FOURCC_CODES, help="Format piksel kamera, misalnya MJPG (USB 2.0 cepat) atau YUYV")
+    parser.add_argument("--buffer-size", type=int, default=1, help="Jumlah frame di buffer driver kamera (bawaan 1)")
+    parser.add_argument("--target-fps", type=float, default=30.0,
+                        help="Target FPS; kualitas diturunkan bertahap jika frame melewati anggaran (0 = nonaktif)")
+    parser.add_argument("--tracker-mode", default="full", choices=["full", "roi"],
+                        help="Inferensi seluruh frame, atau deteksi diperkecil + crop di sekitar tangan (roi)")
+    parser.add_argument("--infer-every", type=int, default=1, help="Jalankan MediaPipe tiap N frame (bawaan 1)")
+    parser.add_argument("--infer-budget-ms", type=float,
+                        help="Rata-rata biaya inferensi per frame maksimum (ms); frame lain memakai prediksi filter")
+    parser.add_argument("--landmark-filter", choices=FILTER_NAMES,
+                        help="Filter landmark untuk menghaluskan dan memprediksi di antara inferensi")
+    parser.add_argument("--source", action="append", metavar="SUMBER[,PORT[,CHANNEL]]",
+                        help="Jalankan satu proses tracker per sumber (boleh diulang), "
+                             "misalnya --source 0 --source \"1,visualDj 2,0\" (selalu headless)")
+    return parser.parse_args()
+
+def tracker_options(args):
+    # Argumen HandTracker dari opsi baris perintah (dipakai pipeline dan worker supervisor)
+    return {"mode": args.tracker_mode, "infer_every": args.infer_every, "infer_budget_ms": args.infer_budget_ms,
+            "landmark_filter": args.landmark_filter}
+
+def camera_options(args):
+    # Argumen CameraCapture dari opsi baris perintah (dipakai pipeline dan worker supervisor)
+    return {"width": args.width, "height": args.height, "fps": args.fps, "fourcc": args.fourcc,
+            "buffer_size": args.buffer_size}
+
+def replay(args):
+    # Putar ulang rekaman: hanya MIDI dan visualisasi, tanpa kamera, audio, atau MediaPipe
+    from midi_control import MidiController
+    replayer = Replayer(args.replay)
+    midi_controller = MidiController(mappings=load_mappings(args.mapping) if args.mapping else None)
+    visualizer = None
+    if not args.headless:
+        from visualizer import Visualizer
+        visualizer = Visualizer()
+    try:
+        frames = replayer.replay(midi_controller, visualizer, realtime=not args.replay_fast, show=not args.headless)
+        print(f"{frames} frame diputar ulang.")
+    finally:
+        midi_controller.close()
+        if visualizer is not None:
+            visualizer.close()
+            cv2.destroyAllWindows()
+
+def supervise(args):
+    # Banyak kamera/penampil: satu proses HandTracker per sumber, MIDI dirutekan per sumber
+    sources = [parse_source_spec(spec) for spec in args.source]
+    instrumentation = Instrumentation(enabled=True, dump_path=args.stats_file)
+    mappings = load_mappings(args.mapping) if args.mapping else None
+    Supervisor(sources, tracker_kwargs=tracker_options(args), camera_kwargs=camera_options(args),
+               instrumentation=instrumentation, mappings=mappings).run()
+
+def close_components(components):
+    # Menutup komponen yang sudah berhasil dibuka jika komponen lain gagal
+    if "camera" in components:
+        components["camera"].release()
+    for name in ("midi", "audio", "visualizer"):
+        if name in components:
+            components[name].close()
 
 def main():
-    # Buka kamera default (indeks 0)
-    cap = cv2.VideoCapture(0)
-    if not cap.isOpened():
-        print("Kamera tidak dapat dibuka!")
+    args = parse_args()
+    logger.configure(level=args.log_level, jsonl_path=args.log_file)  # Log asinkron (dikuras thread latar)
+    if args.replay:
+        replay(args)
+        return
+    if args.source:
+        supervise(args)
         return
 
-    # Inisialisasi komponen
-    hand_tracker = HandTracker()  # Pelacak tangan
-    midi_controller = MidiController()  # Kontroler MIDI
-    visualizer = Visualizer()  # Visualisasi
-    audio_capture = AudioCapture()  # Penangkap audio
-
-    while True:
-        # Baca frame dari kamera
-        ret, frame = cap.read()
-        if not ret or frame is None or frame.size == 0:
-            print("Gagal membaca frame dari kamera!")
-            break
+    # Inisialisasi komponen secara paralel: kamera, model MediaPipe, port MIDI, visualizer, dan audio.
+    # Modul berat (mediapipe, mido, PIL, pyaudio) diimpor di dalam tugas masing-masing.
+    mappings = load_mappings(args.mapping) if args.mapping else None  # Pemetaan gestur (opsional)
+    report = StartupReport()
 
-        # Deteksi tangan dan dapatkan data (posisi tangan dan kecepatan)
-        hands_data, speed = hand_tracker.track_hands(frame)
+    def open_camera():
+        # Buka kamera (atau file video) dengan thread grabber yang selalu menyimpan frame terbaru,
+        # lalu ambil satu frame agar auto-exposure mulai berjalan
+        with report.step("camera", "open"):
+            cap = CameraCapture(args.camera, **camera_options(args))
+        with report.step("camera", "first_frame"):
+            cap.grab()
+        return cap
 
-        # Kirim sinyal MIDI berdasarkan data tangan
-        midi_controller.send_midi_signals(hands_data, speed)
+    def load_tracker():
+        with report.step("tracker", "import"):
+            from hand_tracking import HandTracker
+        with report.step("tracker", "init"):
+            hand_tracker = HandTracker(**tracker_options(args))  # Pelacak tangan
+        with report.step("tracker", "warm_up"):
+            hand_tracker.warm_up()  # Inferensi pertama tidak lagi jatuh di frame kamera pertama
+        return hand_tracker
 
-        # Ambil nilai volume dan filter dari data tangan
-        volume = hands_data[0]["distance"] if hands_data else 0  # Volume dari tangan kanan
-        filter_level = hands_data[1]["distance"] if len(hands_data) > 1 else 0  # Filter dari tangan kiri
+    def open_midi():
+        with report.step("midi", "import"):
+            from midi_control import MidiController
+        with report.step("midi", "open_port"):
+            return MidiController(mappings=mappings)  # Kontroler MIDI
 
-        # Ambil data audio dari desktop
-        audio_data = audio_capture.get_audio_data()
+    def load_visualizer():
+        with report.step("visualizer", "import"):
+            from visualizer import Visualizer
+        with report.step("visualizer", "init"):
+            return Visualizer()  # Visualisasi
 
-        # Gambar visualisasi pada frame
-        frame = visualizer.draw_visuals(frame, hands_data, volume, filter_level, speed, audio_data)
+    def open_audio():
+        # Perangkat audio hanya dienumerasi sekali, di sini
+        with report.step("audio", "import"):
+            from audio_capture import AudioCapture
+        num_bands = report.wait_for("visualizer").NUM_BARS
+        with report.step("audio", "open_stream"):
+            return AudioCapture(mode="callback", num_bands=num_bands)  # Penangkap audio dan analisis spektrum
 
-        # Tampilkan frame yang telah diproses
-        cv2.imshow("FL Studio Controller", frame)
+    tasks = {"camera": open_camera, "tracker": load_tracker, "midi": open_midi}
+    if not args.headless:
+        # Mode headless: hanya capture -> tracking -> MIDI, perangkat audio tidak pernah dibuka
+        tasks.update(visualizer=load_visualizer, audio=open_audio)
+    components, errors = report.run_parallel(tasks)
+    report.log_summary()  # Laporan waktu startup per komponen
+    if errors:
+        for component, error in errors.items():
+            log.error("Gagal menginisialisasi {component}: {error}", component=component, error=error)
+        close_components(components)
+        return
 
-        # Keluar dari loop jika tombol 'q' ditekan
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
+    cap = components["camera"]
+    hand_tracker = components["tracker"]
+    midi_controller = components["midi"]
+    visualizer = components.get("visualizer")
+    audio_capture = components.get("audio")
 
-    # Bersihkan sumber daya
-    cap.release()  # Tutup kamera
-    audio_capture.close()  # Tutup penangkap audio
-    visualizer.close()  # Tutup visualizer
-    cv2.destroyAllWindows()  # Tutup semua jendela OpenCV
+    # Jalankan pipeline: capture, tracking, MIDI, dan audio di thread terpisah,
+    # render dan tampilan di thread utama. Tekan 'q' untuk keluar (Ctrl+C di mode headless).
+    # Mode headless selalu mencatat latensi agar bisa dilaporkan saat keluar.
+    instrumentation = Instrumentation(enabled=args.stats or bool(args.stats_file) or args.headless,
+                                      overlay=args.stats and not args.headless,
+                                      dump_path=args.stats_file)  # Pencatat latensi (opsional)
+    recorder = Recorder(args.record) if args.record else None  # Perekam (opsional)
+    governor = None
+    if args.target_fps > 0:
+        governor = QualityGovernor(args.target_fps, visualizer, hand_tracker)  # Penjaga anggaran frame
+    pipeline = Pipeline(cap, hand_tracker, midi_controller, visualizer, audio_capture,
+                        instrumentation=instrumentation, recorder=recorder, governor=governor)
+    pipeline.run()  # Sumber daya dibersihkan otomatis saat pipeline berhenti
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
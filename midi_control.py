@@ -1,45 +1,240 @@
+import threading
+import time
 import mido
 from mido import Message
+from mido.ports import BaseOutput
+from gesture_mapping import GestureMapper
+from logger import get_logger
 
 print("File midi_control.py berhasil diimpor!")
 
+log = get_logger("midi")
+
+
+class MemoryOutput(BaseOutput):
+    """
+    Port MIDI di memori yang menyimpan setiap pesan beserta waktunya.
+
+    Dipakai untuk menguji throughput dan latensi tanpa FL Studio atau driver MIDI.
+    """
+
+    def __init__(self, name="memory", **kwargs):
+        self.messages = []  # Daftar (timestamp, pesan) yang diterima
+        BaseOutput.__init__(self, name=name, **kwargs)
+
+    def _send(self, message):
+        self.messages.append((time.perf_counter(), message))
+
+
+class MidiOutputEngine:
+    """
+    Mesin output MIDI berbasis perubahan dengan thread pengirim tersendiri.
+
+    Menyimpan nilai terakhir yang dikirim per (channel, CC), hanya mengirim jika perubahan
+    melewati deadband, membatasi laju pesan per kontroler, dan menggabungkan lonjakan
+    sehingga nilai terbaru yang menang. Pemanggil update() tidak pernah menunggu outport.send.
+    """
+
+    def __init__(self, outport, deadband=1, max_rate_hz=100.0, max_pending=64, verbose=False):
+        self.outport = outport  # Port MIDI tujuan
+        self.deadband = deadband  # Perubahan minimum agar nilai dikirim ulang
+        self.min_interval = 1.0 / max_rate_hz if max_rate_hz else 0.0  # Jarak minimum antar pesan per kontroler
+        self.max_pending = max_pending  # Batas jumlah kontroler yang menunggu dikirim
+        self.verbose = verbose  # Tampilkan setiap pesan yang benar-benar dikirim
+        self.on_send = None  # Hook opsional on_send(control, value, origin, channel) setelah pesan dikirim
+
+        self._last_sent = {}  # (channel, control) -> nilai terakhir yang dikirim
+        self._last_time = {}  # (channel, control) -> waktu pengiriman terakhir
+        self._pending = {}  # (channel, control) -> (nilai, waktu update pertama, waktu asal data)
+        self._notes = []  # Pesan not (on/off) yang menunggu dikirim, urutan dipertahankan
+        self._cond = threading.Condition()
+        self._running = True
+
+        # Statistik
+        self.sent = 0  # Pesan yang dikirim ke port
+        self.coalesced = 0  # Update yang ditimpa update lebih baru sebelum terkirim
+        self.suppressed = 0  # Update yang diabaikan karena di dalam deadband
+        self.dropped = 0  # Update yang dibuang karena antrian penuh
+        self.total_latency = 0.0  # Jumlah jeda update -> kirim (detik)
+        self.max_latency = 0.0
+
+        self._thread = threading.Thread(target=self._sender_loop, name="midi-sender", daemon=True)
+        self._thread.start()
+
+    def update(self, control, value, channel=0, origin=None):
+        """
+        Menjadwalkan nilai CC baru. Tidak memblokir; nilai lama yang belum terkirim ditimpa.
+
+        origin adalah waktu capture frame asal nilai (perf_counter), diteruskan ke hook on_send.
+        """
+        key = (channel, control)
+        value = max(0, min(127, int(value)))
+        with self._cond:
+            last = self._last_sent.get(key)
+            if last is not None and abs(value - last) < self.deadband:
+                # Nilai kembali ke dekat nilai terkirim: batalkan yang masih menunggu
+                if self._pending.pop(key, None) is not None:
+                    self.coalesced += 1
+                self.suppressed += 1
+                return
+
+            pending = self._pending.get(key)
+            if pending is not None:
+                self._pending[key] = (value, pending[1], origin)  # Nilai terbaru menang, waktu antri awal dipertahankan
+                self.coalesced += 1
+                return
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return
+            self._pending[key] = (value, time.perf_counter(), origin)
+            self._cond.notify()
+
+    def note(self, note, velocity, channel=0, origin=None):
+        """
+        Menjadwalkan not on (velocity > 0) atau not off (velocity 0).
+
+        Berbeda dengan CC, not tidak digabung maupun dibatasi laju agar tidak ada on/off yang hilang.
+        """
+        kind = 'note_on' if velocity > 0 else 'note_off'
+        message = Message(kind, channel=channel, note=max(0, min(127, int(note))), velocity=max(0, min(127, int(velocity))))
+        with self._cond:
+            if len(self._notes) >= self.max_pending:
+                self.dropped += 1
+                return
+            self._notes.append((message, time.perf_counter()))
+            self._cond.notify()
+
+    def _sender_loop(self):
+        while True:
+            with self._cond:
+                ready = []
+                notes, self._notes = self._notes, []
+                while self._running and not ready and not notes:
+                    now = time.perf_counter()
+                    wait = None
+                    for key in list(self._pending):
+                        next_time = self._last_time.get(key, 0.0) + self.min_interval
+                        if next_time <= now:
+                            value, queued_at, origin = self._pending.pop(key)
+                            # Catat sebelum dikirim agar update() dan batas laju melihat nilai ini
+                            self._last_sent[key] = value
+                            self._last_time[key] = now
+                            ready.append((key, value, queued_at, origin))
+                        else:
+                            # Kontroler ini masih dibatasi laju: tunggu sampai slot berikutnya
+                            wait = next_time - now if wait is None else min(wait, next_time - now)
+                    if not ready:
+                        self._cond.wait(wait)
+                        notes, self._notes = self._notes, []
+                if not self._running:
+                    # Engine ditutup: kirim semua yang masih tertunda tanpa batas laju,
+                    # agar posisi terakhir setiap kontroler tetap sampai ke FL Studio
+                    notes += self._notes
+                    self._notes = []
+                    now = time.perf_counter()
+                    for key, (value, queued_at, origin) in self._pending.items():
+                        self._last_sent[key] = value
+                        self._last_time[key] = now
+                        ready.append((key, value, queued_at, origin))
+                    self._pending.clear()
+                if not ready and not notes:
+                    return  # Engine ditutup dan tidak ada lagi yang tertunda
+
+            # Kirim di luar kunci agar update() tidak pernah menunggu port MIDI
+            for message, queued_at in notes:
+                self.outport.send(message)
+                latency = time.perf_counter() - queued_at
+                with self._cond:
+                    self.sent += 1
+                    self.total_latency += latency
+                    self.max_latency = max(self.max_latency, latency)
+                if self.verbose:
+                    log.info("{type} {note} (ch {channel}): {velocity}", type=message.type, note=message.note,
+                             channel=message.channel + 1, velocity=message.velocity)
+            for (channel, control), value, queued_at, origin in ready:
+                self.outport.send(Message('control_change', channel=channel, control=control, value=value))
+                latency = time.perf_counter() - queued_at
+                with self._cond:
+                    self.sent += 1
+                    self.total_latency += latency
+                    self.max_latency = max(self.max_latency, latency)
+                if self.on_send is not None:
+                    self.on_send(control, value, origin, channel)
+                if self.verbose:
+                    log.info("CC {control} (ch {channel}): {value}", control=control, channel=channel + 1, value=value)
+
+    def flush(self, timeout=1.0):
+        """
+        Menunggu sampai semua nilai yang tertunda terkirim (atau timeout).
+        """
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            with self._cond:
+                if not self._pending and not self._notes:
+                    return True
+            time.sleep(0.001)
+        return False
+
+    def stats(self):
+        """
+        Mengembalikan statistik pengiriman untuk pemantauan.
+        """
+        with self._cond:
+            return {
+                "sent": self.sent,
+                "coalesced": self.coalesced,
+                "suppressed": self.suppressed,
+                "dropped": self.dropped,
+                "avg_latency_ms": self.total_latency * 1000.0 / self.sent if self.sent else 0.0,
+                "max_latency_ms": self.max_latency * 1000.0,
+            }
+
+    def close(self):
+        """
+        Menghentikan thread pengirim setelah nilai CC dan not yang tertunda terkirim.
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(1.0)
+
+
 class MidiController:
-    def __init__(self):
-        # Menampilkan daftar port MIDI output yang tersedia
-        print("Available MIDI Output Ports:", mido.get_output_names())
-        
-        try:
-            # Membuka port MIDI dengan nama 'visualDj 1'
-            self.outport = mido.open_output('visualDj 1')  # Ganti dengan nama port Anda
-            print(f"Port MIDI '{self.outport.name}' berhasil dibuka!")
-        except Exception as e:
-            # Menangani error jika gagal membuka port MIDI
-            print(f"Error membuka port MIDI: {e}")
-            raise
-
-    def send_midi_signals(self, hands_data, speed):
-        # Keluar dari fungsi jika tidak ada data tangan
-        if not hands_data:
-            return
-
-        # Kontrol Volume menggunakan tangan kanan
-        right_hand = hands_data[0]
-        volume = right_hand["distance"]  # Nilai sudah dinormalisasi ke 0-127
-        volume_message = Message('control_change', control=7, value=int(volume))  # CC 7 untuk volume
-        self.outport.send(volume_message)
-
-        # Kontrol EQ menggunakan tangan kiri
-        eq_level = 0
-        if len(hands_data) > 1:
-            left_hand = hands_data[1]
-            eq_level = left_hand["distance"]  # Nilai sudah dinormalisasi ke 0-127
-            eq_message = Message('control_change', control=10, value=int(eq_level))  # CC 10 untuk EQ
-            self.outport.send(eq_message)
-
-        # Kontrol Speed
-        speed_value = int(speed)  # Pastikan speed_value adalah integer
-        speed_message = Message('control_change', control=22, value=speed_value)  # CC 22 untuk speed
-        self.outport.send(speed_message)
-
-        # Menampilkan nilai volume, EQ, dan speed untuk debugging
-        print(f"Volume: {volume}, EQ Level: {eq_level}, Speed: {speed_value}")
\ No newline at end of file
+    def __init__(self, port_name='visualDj 1', outport=None, virtual=False, channel=0,
+                 deadband=1, max_rate_hz=100.0, verbose=False, mappings=None):
+        self.channel = channel  # Channel MIDI (0-15) untuk semua CC
+        if outport is None:
+            # Menampilkan daftar port MIDI output yang tersedia
+            print("Available MIDI Output Ports:", mido.get_output_names())
+
+            try:
+                # Membuka port MIDI dengan nama 'visualDj 1' (atau port virtual jika didukung backend)
+                outport = mido.open_output(port_name, virtual=virtual)  # Ganti dengan nama port Anda
+                print(f"Port MIDI '{outport.name}' berhasil dibuka!")
+            except Exception as e:
+                # Menangani error jika gagal membuka port MIDI
+                print(f"Error membuka port MIDI: {e}")
+                raise
+        self.outport = outport
+
+        # Pengiriman dilakukan oleh thread latar belakang, hanya saat nilai berubah
+        self.engine = MidiOutputEngine(self.outport, deadband=deadband, max_rate_hz=max_rate_hz, verbose=verbose)
+
+        # Pemetaan gestur -> CC/not (bawaan: volume CC 7, EQ CC 10, speed CC 22)
+        self.mapper = GestureMapper(mappings, channel)
+
+    def send_midi_signals(self, hands_data, timestamp=None):
+        """
+        Mengevaluasi semua pemetaan gestur untuk data tangan ini dan mengirim nilai yang berubah.
+
+        CC 22 (speed) dihitung oleh pemetaan "speed" dari jarak kedua ibu jari.
+        """
+        # Frame tanpa tangan tetap dievaluasi agar gerbang not yang masih on dilepas (note_off)
+        self.mapper.apply(self.engine, hands_data, timestamp)
+
+    def close(self):
+        """
+        Menghentikan mesin output lalu menutup port MIDI.
+        """
+        self.engine.close()
+        self.outport.close()
@@ -0,0 +1,332 @@
+import threading
+import time
+import cv2
+from instrumentation import Instrumentation
+from logger import get_logger
+
+log = get_logger("pipeline")
+
+
+class LatestValue:
+    """
+    Slot berisi satu nilai terbaru (antrian drop-stale).
+
+    Penulis selalu menimpa nilai lama, sehingga pembaca tidak pernah memproses data basi.
+    Setiap nilai diberi nomor urut agar pembaca bisa menunggu nilai yang benar-benar baru.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._value = None
+        self._seq = 0  # Nomor urut nilai terakhir
+        self._consumed = True  # Apakah nilai terakhir sudah diambil pembaca
+        self.dropped = 0  # Jumlah nilai yang ditimpa sebelum sempat dibaca
+
+    def put(self, value):
+        """
+        Menyimpan nilai baru dan membangunkan pembaca yang sedang menunggu.
+        """
+        with self._cond:
+            if not self._consumed:
+                self.dropped += 1
+            self._value = value
+            self._seq += 1
+            self._consumed = False
+            self._cond.notify_all()
+
+    def get(self, last_seq=0, timeout=None):
+        """
+        Menunggu nilai dengan nomor urut lebih besar dari last_seq.
+
+        Mengembalikan (seq, value), atau (last_seq, None) jika timeout.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > last_seq, timeout):
+                return last_seq, None
+            self._consumed = True
+            return self._seq, self._value
+
+    def peek(self):
+        """
+        Mengambil nilai terakhir tanpa menunggu (None jika belum ada).
+        """
+        with self._cond:
+            return self._value
+
+
+class Pipeline:
+    """
+    Runtime berpipa: capture, tracking, MIDI, audio, dan render berjalan di thread terpisah.
+
+    Tahap-tahap dihubungkan dengan slot LatestValue, sehingga jalur kontrol
+    (capture -> tracking -> MIDI) tidak pernah menunggu audio maupun tampilan.
+    Render dan tampilan tetap berjalan di thread utama karena cv2.imshow memerlukannya.
+
+    Jika visualizer dan audio_capture bernilai None (mode headless), hanya jalur kontrol
+    yang berjalan: tidak ada penggambaran, jendela, analisis spektrum, maupun perangkat audio.
+    """
+
+    WINDOW_NAME = "FL Studio Controller"
+
+    def __init__(self, cap, hand_tracker, midi_controller, visualizer, audio_capture, poll_timeout=0.1,
+                 instrumentation=None, show=True, recorder=None, governor=None):
+        self.cap = cap  # Sumber frame kamera
+        self.hand_tracker = hand_tracker  # Pelacak tangan
+        self.midi_controller = midi_controller  # Kontroler MIDI
+        self.visualizer = visualizer  # Visualisasi (None untuk mode headless)
+        self.audio_capture = audio_capture  # Penangkap audio (None untuk mode headless)
+        self.poll_timeout = poll_timeout  # Batas waktu tunggu agar thread bisa memeriksa sinyal berhenti
+        self.show = show and visualizer is not None  # Tampilkan jendela OpenCV (False untuk benchmark tanpa layar)
+        self.tracked_frames = 0  # Jumlah frame yang sudah diproses tracker
+        self.rendered_frames = 0  # Jumlah frame yang sudah digambar
+
+        # Pencatat latensi per tahap (nonaktif secara default, overhead diabaikan)
+        self.instrumentation = instrumentation or Instrumentation()
+        self.midi_controller.engine.on_send = self.instrumentation.on_midi_send
+
+        # Perekam landmark dan event CC (opsional)
+        self.recorder = recorder
+        if recorder is not None:
+            recorder.attach(self.midi_controller)
+
+        # Penjaga anggaran waktu frame (opsional): menurunkan kualitas saat beban tinggi
+        self.governor = governor
+
+        # Slot nilai terbaru antar tahap
+        self.frames = LatestValue()  # (frame_id, timestamp, frame) dari kamera
+        self.tracks = LatestValue()  # (frame_id, timestamp, frame, hands_data, waktu inferensi) dari tracker
+        self.audio = LatestValue()  # Data spektrum audio terbaru
+
+        self._stop_event = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """
+        Menjalankan semua tahap latar belakang.
+        """
+        stages = [
+            ("capture", self._capture_loop),
+            ("tracking", self._tracking_loop),
+            ("midi", self._midi_loop),
+        ]
+        if self.audio_capture is not None:
+            stages.append(("audio", self._audio_loop))
+        for name, target in stages:
+            thread = threading.Thread(target=self._run_stage, args=(name, target), name=f"pipeline-{name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _run_stage(self, name, target):
+        # Jika satu tahap gagal, hentikan seluruh pipeline agar tidak menggantung
+        try:
+            target()
+        except Exception as e:
+            log.error("Tahap '{stage}' berhenti karena error: {error}", stage=name, error=e)
+            self._stop_event.set()
+
+    @property
+    def running(self):
+        return not self._stop_event.is_set()
+
+    def _capture_loop(self):
+        frame_id = 0
+        # CameraCapture menyediakan waktu grab dari thread grabber-nya; cv2.VideoCapture biasa tidak
+        read_latest = getattr(self.cap, "read_latest", None)
+        # File video berakhir secara normal; hanya kamera yang gagal dibaca dianggap error
+        is_file = getattr(self.cap, "is_file", None)
+        if is_file is None:
+            is_file = self.cap.get(cv2.CAP_PROP_FRAME_COUNT) > 0
+        while self.running:
+            # Baca frame dari kamera
+            start = time.perf_counter()
+            if read_latest is not None:
+                frame, timestamp = read_latest(self.poll_timeout)
+                if frame is None and self.cap.isOpened():
+                    continue  # Belum ada frame baru; periksa lagi sinyal berhenti
+            else:
+                ret, frame = self.cap.read()
+                timestamp = time.perf_counter()
+            if frame is None or frame.size == 0:
+                if is_file:
+                    log.info("Video selesai diputar ({frames} frame).", frames=frame_id)
+                else:
+                    log.error("Gagal membaca frame dari kamera!")
+                self._stop_event.set()
+                break
+            self.instrumentation.record("capture", time.perf_counter() - start)  # Waktu menunggu frame
+            frame_id += 1
+            self.frames.put((frame_id, timestamp, frame))
+
+    def _tracking_loop(self):
+        seq = 0
+        while self.running:
+            seq, item = self.frames.get(seq, timeout=self.poll_timeout)
+            if item is None:
+                continue
+            frame_id, timestamp, frame = item
+
+            # Deteksi tangan dan dapatkan data posisi tangan
+            start = time.perf_counter()
+            hands_data = self.hand_tracker.track_hands(frame)
+            inference = time.perf_counter() - start
+            self.instrumentation.record("inference", inference)
+            self.tracked_frames += 1
+            if self.recorder is not None:
+                self.recorder.record_frame(timestamp, hands_data)
+            if self.visualizer is not None:
+                # Render di thread utama bisa tertahan lebih lama dari putaran pool (imshow/waitKey,
+                # jendela digeser): beri salinan sendiri agar koordinat dan label tidak tercampur
+                hands_data = hands_data.copy()
+            else:
+                frame = None  # Mode headless: frame tidak dirender, jangan ditahan lebih lama
+                if self.governor is not None:
+                    # Tanpa render, inferensi adalah tahap tersibuk
+                    self.governor.record(inference, time.perf_counter() - timestamp)
+            self.tracks.put((frame_id, timestamp, frame, hands_data, inference))
+
+    def _midi_loop(self):
+        seq = 0
+        while self.running:
+            seq, item = self.tracks.get(seq, timeout=self.poll_timeout)
+            if item is None:
+                continue
+            _, timestamp, _, hands_data, _ = item
+
+            # Kirim sinyal MIDI berdasarkan data tangan (timestamp capture untuk latensi capture -> CC)
+            start = time.perf_counter()
+            self.midi_controller.send_midi_signals(hands_data, timestamp)
+            self.instrumentation.record_since("midi", start)
+
+    def _audio_loop(self):
+        while self.running:
+            # Di mode callback, tunggu blok audio baru agar tidak terjadi loop sibuk
+            if not self.audio_capture.wait_for_data(self.poll_timeout):
+                continue
+
+            # Ambil data audio dari desktop (boleh memblokir, tidak menahan tahap lain)
+            start = time.perf_counter()
+            audio_data = self.audio_capture.get_audio_data()
+            self.instrumentation.record_since("audio", start)
+            if audio_data is None:
+                # Hindari loop sibuk saat aliran audio tidak tersedia
+                self._stop_event.wait(self.poll_timeout)
+                continue
+            self.audio.put(audio_data)
+
+            # Fitur audio (onset/tempo) diperbarui per blok oleh get_audio_data(); dilaporkan di level debug
+            features = self.audio_capture.latest_features()
+            if features is not None:
+                log.debug("Audio: RMS {rms:.3f}, {onsets} onset, tempo {tempo:.1f} BPM (keyakinan {confidence:.2f})",
+                          rate_limit=2.0, rms=features.rms, onsets=features.onsets, tempo=features.tempo,
+                          confidence=features.tempo_confidence)
+
+    def run(self):
+        """
+        Menjalankan loop render/tampilan di thread utama sampai 'q' ditekan atau pipeline berhenti.
+        """
+        if self.visualizer is None:
+            self.run_headless()
+            return
+
+        self.start()
+        seq = 0
+        try:
+            while self.running:
+                seq, item = self.tracks.get(seq, timeout=self.poll_timeout)
+                if item is not None:
+                    _, timestamp, frame, hands_data, inference = item
+                    start = time.perf_counter()
+
+                    # Nilai volume dan filter yang benar-benar dikirim (pemetaan "volume"/"eq") dan tangannya
+                    volume, filter_level, label_hands = self.midi_controller.mapper.labels(hands_data)
+
+                    # Gambar visualisasi memakai data audio terbaru yang tersedia
+                    frame = self.visualizer.draw_visuals(frame, hands_data, volume, filter_level, self.audio.peek(),
+                                                         label_hands)
+                    frame = self.instrumentation.draw_overlay(frame)
+                    if self.governor is not None:
+                        frame = self.governor.draw_overlay(frame)
+                    render_end = time.perf_counter()
+                    self.instrumentation.record("render", render_end - start)
+                    self.rendered_frames += 1
+
+                    # Tampilkan frame yang telah diproses
+                    if self.show:
+                        cv2.imshow(self.WINDOW_NAME, frame)
+                    elif self.governor is not None:
+                        self._record_quality(inference, start, timestamp)
+
+                if not self.show:
+                    continue
+
+                # Keluar dari loop jika tombol 'q' ditekan
+                key = cv2.waitKey(1) & 0xFF
+                if item is not None:
+                    self.instrumentation.record_since("display", render_end)
+                    self.instrumentation.record_since("capture_to_display", timestamp)
+                    if self.governor is not None:
+                        self._record_quality(inference, start, timestamp)
+                if key == ord('q'):
+                    break
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def _record_quality(self, inference, render_start, timestamp):
+        # Throughput dibatasi tahap tersibuk: inferensi (thread tracking) atau render + tampilan
+        # (thread utama). Latensi capture -> tampilan dicatat terpisah, tidak menentukan level.
+        now = time.perf_counter()
+        self.governor.record(max(inference, now - render_start), now - timestamp)
+
+    def run_headless(self):
+        """
+        Menjalankan jalur kontrol saja (capture -> tracking -> MIDI) sampai Ctrl+C atau pipeline berhenti.
+
+        Saat selesai mencetak frame/detik dan latensi capture -> CC.
+        """
+        self.start()
+        start = time.perf_counter()
+        try:
+            while self.running:
+                self._stop_event.wait(self.poll_timeout)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stop()
+            fps = self.tracked_frames / elapsed if elapsed > 0 else 0.0
+            print(f"Headless: {self.tracked_frames} frame dalam {elapsed:.1f} s -> {fps:.1f} frame/s")
+            if self.governor is not None:
+                stats = self.governor.stats()
+                print(f"Kualitas akhir: level {stats['level']} ({stats['name']}), {stats['changes']} perubahan")
+            latency = self.instrumentation.total_summary().get("capture_to_cc")
+            if latency is not None:
+                print(f"Latensi capture -> CC: p50 {latency['p50_ms']:.1f}  p95 {latency['p95_ms']:.1f}  "
+                      f"p99 {latency['p99_ms']:.1f} ms")
+
+    def stop(self, join_timeout=2.0):
+        """
+        Menghentikan semua tahap lalu membersihkan sumber daya dengan urutan yang aman.
+        """
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(join_timeout)
+        self._threads = []
+
+        # Bersihkan sumber daya setelah tidak ada thread yang memakainya
+        if hasattr(self.cap, "stats"):
+            stats = self.cap.stats()
+            log.info("Kamera: {frames} frame di-grab, {dropped} frame basi dibuang",
+                     frames=stats["frames"], dropped=stats["dropped"])
+        self.cap.release()  # Tutup kamera
+        self.midi_controller.close()  # Hentikan pengirim MIDI dan tutup port
+        if self.audio_capture is not None:
+            self.audio_capture.close()  # Tutup penangkap audio
+        if self.visualizer is not None:
+            self.visualizer.close()  # Tutup visualizer
+        if self.show:
+            cv2.destroyAllWindows()  # Tutup semua jendela OpenCV
+        self.instrumentation.dump()  # Simpan statistik latensi jika diminta
+        if self.recorder is not None:
+            self.recorder.close()  # Tulis header rekaman agar bisa di-memory-map
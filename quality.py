@@ -0,0 +1,179 @@
+import cv2
+from logger import get_logger
+
+log = get_logger("quality")
+
+# Level kualitas, diturunkan dengan urutan tetap saat frame melewati anggaran
+FULL, NO_LABELS, NO_SPECTRUM, NO_LANDMARKS, LOW_RESOLUTION, DECIMATED = range(6)
+LEVEL_NAMES = {
+    FULL: "penuh",
+    NO_LABELS: "tanpa label",
+    NO_SPECTRUM: "tanpa spektrum",
+    NO_LANDMARKS: "tanpa landmark",
+    LOW_RESOLUTION: "resolusi rendah",
+    DECIMATED: "desimasi inferensi",
+}
+
+
+class QualityGovernor:
+    """
+    Menjaga waktu per frame di bawah anggaran target FPS dengan menurunkan kualitas bertahap.
+
+    Urutan penurunan: label teks, spektrum, gambar landmark, resolusi input dan
+    model_complexity MediaPipe, lalu desimasi inferensi. Waktu frame adalah waktu kerja
+    per frame tahap tersibuk (misalnya inferensi atau render + tampilan): pada pipeline
+    bertingkat tahap itulah yang membatasi throughput, sedangkan latensi capture -> render
+    boleh melewati anggaran selama throughput terjaga, sehingga latensi hanya dicatat
+    terpisah. Level turun jika rata-rata eksponensial waktu frame melewati anggaran
+    selama down_frames frame berturut-turut,
+    dan naik kembali hanya jika ada ruang (di bawah up_ratio x anggaran) selama up_frames
+    frame; jarak ambang dan jumlah frame yang berbeda itu mencegah level berosilasi.
+
+    Waktu frame di level yang lebih murah tidak memprediksi biaya level di atasnya, sehingga
+    waktu frame terakhir di setiap level diingat saat level itu ditinggalkan. Jika level di
+    atas terakhir melewati anggaran, naik hanya dicoba lagi setelah retry_frames frame, dan
+    jeda itu berlipat dua setiap kali percobaan naik langsung turun lagi. Percobaan yang
+    bertahan berarti beban sudah turun, sehingga level berikutnya dicoba tanpa jeda tambahan.
+
+    Level yang tidak berpengaruh (misalnya level gambar di mode headless) dilewati.
+    """
+
+    def __init__(self, target_fps=30.0, visualizer=None, hand_tracker=None, up_ratio=0.7, down_frames=10,
+                 up_frames=90, smoothing=0.1, low_input_width=320, low_model_complexity=0, decimate_every=2,
+                 retry_frames=900):
+        self.target_fps = target_fps
+        self.budget = 1.0 / target_fps  # Anggaran waktu per frame (detik)
+        self.visualizer = visualizer
+        self.hand_tracker = hand_tracker
+        self.up_ratio = up_ratio  # Naik level hanya jika waktu frame < up_ratio x anggaran
+        self.down_frames = down_frames  # Frame berturut-turut di atas anggaran sebelum turun level
+        self.up_frames = up_frames  # Frame berturut-turut dengan ruang sebelum naik level
+        self.smoothing = smoothing  # Faktor rata-rata eksponensial waktu frame
+        self.low_input_width = low_input_width  # Lebar input MediaPipe di level resolusi rendah
+        self.low_model_complexity = low_model_complexity
+        self.decimate_every = decimate_every  # Inferensi tiap N frame di level desimasi
+        self.retry_frames = retry_frames  # Frame dengan ruang sebelum mencoba lagi level yang terakhir terlalu berat
+
+        # Pengaturan tracker semula, dipulihkan saat level naik kembali
+        if hand_tracker is not None:
+            roi = hand_tracker.mode == "roi"
+            self._tracker_defaults = (hand_tracker.detect_width if roi else hand_tracker.input_width,
+                                      hand_tracker.model_complexity, hand_tracker.infer_every)
+            self._tracker_settings = self._tracker_defaults  # Pengaturan terakhir yang dikirim ke tracker
+
+        # Hanya level yang punya efek pada komponen yang ada
+        self.levels = [FULL]
+        if visualizer is not None:
+            self.levels += [NO_LABELS, NO_SPECTRUM, NO_LANDMARKS]
+        if hand_tracker is not None:
+            self.levels += [LOW_RESOLUTION, DECIMATED]
+
+        self._index = 0  # Posisi di self.levels
+        self.frame_time = None  # Rata-rata eksponensial waktu frame tahap tersibuk (detik)
+        self.latency = None  # Rata-rata eksponensial latensi capture -> selesai (detik), hanya untuk laporan
+        self._over = 0  # Frame berturut-turut di atas anggaran
+        self._under = 0  # Frame berturut-turut dengan ruang
+        self.changes = 0  # Jumlah perubahan level
+        self._costs = [None] * len(self.levels)  # Waktu frame terakhir saat level ditinggalkan karena berat
+        self._retry_wait = retry_frames  # Jeda percobaan naik saat ini (berlipat dua setelah gagal)
+        self._last_up = False  # Perubahan terakhir adalah naik level
+
+    @property
+    def level(self):
+        return self.levels[self._index]
+
+    def record(self, seconds, latency=None):
+        """
+        Mencatat waktu kerja satu frame di tahap tersibuk dan menyesuaikan level jika perlu.
+
+        latency (capture -> selesai, opsional) hanya dirata-rata untuk laporan, tidak memengaruhi level.
+        Mengembalikan level saat ini.
+        """
+        if latency is not None:
+            self.latency = latency if self.latency is None else self.latency + self.smoothing * (latency - self.latency)
+        if self.frame_time is None:
+            self.frame_time = seconds
+        else:
+            self.frame_time += self.smoothing * (seconds - self.frame_time)
+
+        if self.frame_time > self.budget:
+            self._over += 1
+            self._under = 0
+            if self._over >= self.down_frames and self._index < len(self.levels) - 1:
+                self._change(self._index + 1)
+        elif self.frame_time < self.budget * self.up_ratio:
+            self._under += 1
+            self._over = 0
+            if self._index > 0 and self._under >= self._up_wait():
+                self._change(self._index - 1)
+        else:
+            # Di antara kedua ambang: pertahankan level
+            self._over = self._under = 0
+        return self.level
+
+    def _up_wait(self):
+        # Level di atas yang terakhir melewati anggaran baru dicoba lagi setelah jeda percobaan.
+        # Jika level ini dicapai dengan naik dan bertahan, beban sudah turun dan catatan lama basi.
+        cost = self._costs[self._index - 1]
+        if cost is not None and cost > self.budget and not self._last_up:
+            return max(self.up_frames, self._retry_wait)
+        return self.up_frames
+
+    def _change(self, index):
+        down = index > self._index
+        if down:
+            self._costs[self._index] = self.frame_time
+            if self._last_up:
+                self._retry_wait *= 2  # Percobaan naik gagal: tunggu lebih lama sebelum mencoba lagi
+        elif self._last_up:
+            self._retry_wait = self.retry_frames  # Dua kali naik berturut-turut: beban sudah turun
+        self._last_up = not down
+        direction = "turun" if down else "naik"
+        log.info("Kualitas {direction} ke level {quality} ({label}): {ms:.1f} ms/frame, anggaran {budget:.1f} ms",
+                 direction=direction, quality=self.levels[index], label=LEVEL_NAMES[self.levels[index]],
+                 ms=self.frame_time * 1000.0, budget=self.budget * 1000.0)
+        self._index = index
+        self.changes += 1
+        self.apply()
+
+        # Ukur ulang dari awal agar rata-rata lama tidak langsung memicu perubahan berikutnya
+        self.frame_time = None
+        self._over = self._under = 0
+
+    def apply(self):
+        """
+        Menerapkan level saat ini ke visualizer dan tracker.
+        """
+        level = self.level
+        if self.visualizer is not None:
+            self.visualizer.draw_labels = level < NO_LABELS
+            self.visualizer.draw_spectrum = level < NO_SPECTRUM
+            self.visualizer.draw_landmarks = level < NO_LANDMARKS
+        if self.hand_tracker is not None:
+            width, complexity, every = self._tracker_defaults
+            if level >= LOW_RESOLUTION:
+                width = min(width or self.low_input_width, self.low_input_width)
+                complexity = min(complexity, self.low_model_complexity)
+            if level >= DECIMATED:
+                every = max(every, self.decimate_every)
+            if (width, complexity, every) != self._tracker_settings:
+                # Hanya kirim jika berubah: mengganti model MediaPipe tidak murah
+                self._tracker_settings = (width, complexity, every)
+                self.hand_tracker.set_quality(width, complexity, every)
+
+    def draw_overlay(self, frame, origin=(10, None)):
+        """
+        Menulis level kualitas di pojok kiri bawah frame.
+        """
+        x, y = origin
+        y = y or frame.shape[0] - 10
+        ms = self.frame_time * 1000.0 if self.frame_time is not None else 0.0
+        text = f"Kualitas {self.level} ({LEVEL_NAMES[self.level]})  {ms:.1f}/{self.budget * 1000.0:.1f} ms"
+        color = (0, 255, 0) if self.level == FULL else (0, 200, 255)
+        cv2.putText(frame, text, (x, y), cv2.FONT_HERSHEY_PLAIN, 1.0, color, 1, cv2.LINE_AA)
+        return frame
+
+    def stats(self):
+        return {"level": self.level, "name": LEVEL_NAMES[self.level], "changes": self.changes,
+                "frame_time_ms": self.frame_time * 1000.0 if self.frame_time is not None else None,
+                "latency_ms": self.latency * 1000.0 if self.latency is not None else None}
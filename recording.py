@@ -0,0 +1,227 @@
+import os
+import threading
+import time
+import cv2
+import numpy as np
+from hand_state import MAX_HANDS, NUM_LANDMARKS, HandState, as_hand_state
+from gesture_mapping import GestureMapper
+
+# Satu baris per frame: 21 landmark (x, y, z ternormalisasi) untuk maksimal 2 tangan plus handedness
+FRAME_DTYPE = np.dtype([
+    ("t", "<f8"),  # Waktu sejak awal rekaman (detik)
+    ("num_hands", "u1"),  # Jumlah tangan yang valid di baris ini
+    ("frame_size", "<u2", (2,)),  # Lebar dan tinggi frame asal (piksel)
+    ("landmarks", "<f4", (MAX_HANDS, NUM_LANDMARKS, 3)),
+    ("handedness", "u1", (MAX_HANDS,)),  # 0 = tidak diketahui, 1 = kiri, 2 = kanan
+])
+
+# Satu baris per pesan CC yang benar-benar dikirim
+EVENT_DTYPE = np.dtype([
+    ("t", "<f8"),
+    ("channel", "u1"),
+    ("control", "u1"),
+    ("value", "u1"),
+])
+
+
+def recording_paths(path):
+    """
+    Mengembalikan path file frame dan event untuk nama dasar rekaman.
+    """
+    base = path[:-4] if path.endswith(".npy") else path
+    return f"{base}_frames.npy", f"{base}_events.npy"
+
+
+def fill_frame_row(row, t, hands_data):
+    """
+    Mengisi satu baris FRAME_DTYPE dari HandState (atau hands_data list of dict) dengan salinan array langsung.
+    """
+    state = as_hand_state(hands_data)
+    count = state.count
+    row["t"] = t
+    row["num_hands"] = count
+    row["frame_size"] = state.frame_size
+    row["landmarks"][:count] = state.landmarks[:count]
+    row["handedness"][:count] = state.handedness[:count]
+
+
+def hands_data_from_row(row, state=None):
+    """
+    Mengisi HandState (dipakai ulang jika diberikan) dari satu baris FRAME_DTYPE.
+
+    Koordinat piksel dihitung ulang dari landmark ternormalisasi.
+    """
+    state = state or HandState()
+    count = int(row["num_hands"])
+    state.landmarks[:count] = row["landmarks"][:count]
+    state.update(count, (int(row["frame_size"][0]), int(row["frame_size"][1])))
+    if "handedness" in row.dtype.names:
+        state.handedness[:count] = row["handedness"][:count]
+    else:
+        state.handedness[:] = 0  # Rekaman lama belum menyimpan handedness
+    return state
+
+
+class _RecordWriter:
+    """
+    Menulis baris array terstruktur ke file .npy secara bertahap.
+
+    Baris ditampung di buffer yang dialokasikan sekali, dibuang sebagai byte mentah ke file
+    sementara, lalu saat ditutup diberi header .npy sehingga bisa di-memory-map dengan np.load.
+    """
+
+    def __init__(self, path, dtype, chunk_rows=1024):
+        self.path = path
+        self.dtype = dtype
+        self.buffer = np.zeros(chunk_rows, dtype=dtype)  # Buffer baris yang dipakai ulang
+        self.fill = 0
+        self.count = 0
+        self._raw = open(path + ".tmp", "wb")
+
+    def next_row(self):
+        if self.fill == len(self.buffer):
+            self.flush()
+        row = self.buffer[self.fill]
+        self.fill += 1
+        self.count += 1
+        return row
+
+    def flush(self):
+        self._raw.write(self.buffer[:self.fill].tobytes())
+        self.buffer[:self.fill] = 0
+        self.fill = 0
+
+    def close(self):
+        self.flush()
+        self._raw.close()
+        header = {"descr": np.lib.format.dtype_to_descr(self.dtype), "fortran_order": False, "shape": (self.count,)}
+        with open(self.path, "wb") as out, open(self.path + ".tmp", "rb") as raw:
+            np.lib.format.write_array_header_1_0(out, header)
+            while True:
+                block = raw.read(1 << 20)
+                if not block:
+                    break
+                out.write(block)
+        os.remove(self.path + ".tmp")
+
+
+class Recorder:
+    """
+    Perekam landmark, fitur turunan, dan event CC ke file biner kolumnar yang bisa di-mmap.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        frames_path, events_path = recording_paths(path)
+        self._frames = _RecordWriter(frames_path, FRAME_DTYPE)
+        self._events = _RecordWriter(events_path, EVENT_DTYPE)
+        self._lock = threading.Lock()
+        self._start = None  # Waktu perf_counter dari frame pertama
+        self.channel = 0
+
+    def _time(self, timestamp):
+        if self._start is None:
+            self._start = timestamp
+        return timestamp - self._start
+
+    def record_frame(self, timestamp, hands_data):
+        """
+        Mencatat satu frame dari HandState tracker.
+        """
+        with self._lock:
+            fill_frame_row(self._frames.next_row(), self._time(timestamp), hands_data)
+
+    def record_event(self, control, value, origin=None, channel=None):
+        """
+        Mencatat satu pesan CC. Signature sama dengan hook MidiOutputEngine.on_send.
+        """
+        with self._lock:
+            row = self._events.next_row()
+            row["t"] = self._time(time.perf_counter())
+            row["channel"] = self.channel if channel is None else channel
+            row["control"] = control
+            row["value"] = value
+
+    def attach(self, midi_controller):
+        """
+        Memasang perekam pada hook on_send tanpa melepas hook yang sudah ada (misalnya instrumentasi).
+        """
+        self.channel = midi_controller.channel
+        previous = midi_controller.engine.on_send
+
+        def on_send(control, value, origin, channel):
+            if previous is not None:
+                previous(control, value, origin, channel)
+            self.record_event(control, value, origin, channel)  # Channel pesan, bukan channel kontroler
+
+        midi_controller.engine.on_send = on_send
+
+    def close(self):
+        with self._lock:
+            self._frames.close()
+            self._events.close()
+        print(f"Rekaman disimpan: {self._frames.count} frame, {self._events.count} event CC.")
+
+
+class Replayer:
+    """
+    Memutar ulang rekaman ke MidiController dan/atau Visualizer tanpa menjalankan MediaPipe.
+    """
+
+    def __init__(self, path):
+        frames_path, events_path = recording_paths(path)
+        self.frames = np.load(frames_path, mmap_mode="r")  # Di-memory-map, tidak dimuat ke RAM
+        self.events = np.load(events_path, mmap_mode="r")
+        self.state = HandState()  # Dipakai ulang untuk setiap frame yang diputar
+
+    def hands_data(self, row):
+        return hands_data_from_row(row, self.state)
+
+    def replay(self, midi_controller=None, visualizer=None, realtime=True, show=False, on_frame=None,
+               instrumentation=None):
+        """
+        Memutar semua frame. realtime=False memutar secepat mungkin.
+
+        Jika instrumentation diberikan, waktu tahap "midi" dan "render" dicatat per frame.
+        Mengembalikan jumlah frame yang diputar.
+        """
+        start = time.perf_counter()
+        canvas = background = None
+        # Label memakai output pemetaan; tanpa MidiController pemetaan bawaan dievaluasi di sini
+        mapper = midi_controller.mapper if midi_controller is not None else GestureMapper()
+        played = 0
+        for row in self.frames:
+            if realtime:
+                delay = float(row["t"]) - (time.perf_counter() - start)
+                if delay > 0:
+                    time.sleep(delay)
+
+            hands_data = self.hands_data(row)
+            if midi_controller is not None:
+                start_stage = time.perf_counter()
+                midi_controller.send_midi_signals(hands_data)
+                if instrumentation is not None:
+                    instrumentation.record_since("midi", start_stage)
+            elif visualizer is not None:
+                mapper.evaluate(hands_data)
+
+            if visualizer is not None:
+                w, h = int(row["frame_size"][0]), int(row["frame_size"][1])
+                if background is None or background.shape[:2] != (h, w):
+                    background = np.full((h, w, 3), visualizer.BG_COLOR, dtype=np.uint8)
+                    canvas = np.empty_like(background)
+                start_stage = time.perf_counter()
+                np.copyto(canvas, background)  # Latar polos pengganti frame kamera
+                volume, filter_level, label_hands = mapper.labels(hands_data)
+                visualizer.draw_visuals(canvas, hands_data, volume, filter_level, label_hands=label_hands)
+                if instrumentation is not None:
+                    instrumentation.record_since("render", start_stage)
+                if show:
+                    cv2.imshow("Replay", canvas)
+                    if cv2.waitKey(1) & 0xFF == ord('q'):
+                        break
+
+            if on_frame is not None:
+                on_frame(row, hands_data)
+            played += 1
+        return played
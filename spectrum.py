@@ -0,0 +1,139 @@
+import time
+import numpy as np
+
+
+def hz_to_mel(freq):
+    # Konversi frekuensi (Hz) ke skala mel
+    return 2595.0 * np.log10(1.0 + np.asarray(freq, dtype=np.float64) / 700.0)
+
+
+def mel_to_hz(mel):
+    # Konversi skala mel kembali ke frekuensi (Hz)
+    return 700.0 * (10.0 ** (np.asarray(mel, dtype=np.float64) / 2595.0) - 1.0)
+
+
+def build_band_matrix(rate, chunk, num_bands, fmin=40.0, fmax=None, scale="log"):
+    """
+    Membuat matriks bobot (num_bands x jumlah bin rfft) dengan filter segitiga.
+
+    Tepi band ditempatkan merata pada skala log atau mel. Setiap baris dinormalisasi
+    sehingga energi band adalah rata-rata berbobot daya bin di dalamnya.
+    """
+    fmax = fmax or rate / 2
+    bin_freqs = np.fft.rfftfreq(chunk, d=1.0 / rate)
+
+    if scale == "mel":
+        edges = mel_to_hz(np.linspace(hz_to_mel(fmin), hz_to_mel(fmax), num_bands + 2))
+    elif scale == "log":
+        edges = np.geomspace(fmin, fmax, num_bands + 2)
+    else:
+        raise ValueError(f"Skala band tidak dikenal: {scale}")
+
+    weights = np.zeros((num_bands, len(bin_freqs)), dtype=np.float32)
+    for i in range(num_bands):
+        low, center, high = edges[i], edges[i + 1], edges[i + 2]
+        rising = (bin_freqs - low) / (center - low)
+        falling = (high - bin_freqs) / (high - center)
+        weights[i] = np.clip(np.minimum(rising, falling), 0, None)
+        if not weights[i].any():
+            # Band lebih sempit dari resolusi FFT: pakai bin terdekat ke frekuensi tengah
+            weights[i, np.argmin(np.abs(bin_freqs - center))] = 1.0
+        weights[i] /= weights[i].sum()
+    return weights
+
+
+class SpectrumAnalyzer:
+    """
+    Mesin analisis spektrum tunggal: rfft + jendela Hann + matriks band yang dihitung sekali.
+
+    Energi band didapat dari satu perkalian matriks, dinyatakan dalam dB terhadap
+    skala penuh int16 lalu dipetakan ke 0-1, kemudian dihaluskan dengan attack/decay.
+    """
+
+    def __init__(self, rate=44100, chunk=1024, num_bands=10, scale="log", fmin=40.0,
+                 db_range=60.0, attack=0.6, decay=0.15):
+        self.rate = rate  # Sampling rate (Hz)
+        self.chunk = chunk  # Jumlah sampel per analisis
+        self.num_bands = num_bands  # Jumlah band keluaran
+        self.db_range = db_range  # Rentang dinamis (dB) yang dipetakan ke 0-1
+        self.attack = attack  # Faktor smoothing saat energi naik (0 < attack <= 1)
+        self.decay = decay  # Faktor smoothing saat energi turun (0 < decay <= 1)
+
+        # Jendela dan matriks band di-cache sekali di awal
+        self.window = np.hanning(chunk).astype(np.float32)
+        self.band_matrix = build_band_matrix(rate, chunk, num_bands, fmin=fmin, scale=scale)
+
+        # Referensi skala penuh: daya puncak sinus amplitudo 32767 setelah diberi jendela
+        self._power_ref = (32767.0 * self.window.sum() / 2.0) ** 2
+
+        self.smoothed = np.zeros(num_bands, dtype=np.float32)  # Keluaran band terakhir
+        self.features = None  # AudioFeatureExtractor opsional yang memakai spektrum daya setiap blok
+
+        # Statistik biaya CPU (waktu CPU thread) per analisis
+        self.last_cpu_ms = 0.0
+        self.total_cpu_ms = 0.0
+        self.analyses = 0  # Jumlah blok yang sudah dianalisis
+
+    def power_spectrum(self, blocks):
+        """
+        Spektrum daya rfft berjendela untuk array blok (k x chunk).
+        """
+        windowed = blocks.astype(np.float32) * self.window
+        return np.abs(np.fft.rfft(windowed, axis=-1)) ** 2
+
+    def band_energies(self, blocks, power=None):
+        """
+        Menghitung energi band ternormalisasi (0-1) untuk array blok (k x chunk) tanpa smoothing.
+        """
+        if power is None:
+            power = self.power_spectrum(blocks)
+        bands = power @ self.band_matrix.T
+
+        # Konversi ke dB terhadap skala penuh lalu petakan ke rentang 0-1
+        db = 10.0 * np.log10(np.maximum(bands / self._power_ref, 1e-12))
+        return np.clip(1.0 + db / self.db_range, 0.0, 1.0)
+
+    def analyze_batch(self, blocks, end_sample=None):
+        """
+        Menganalisis beberapa blok sekaligus (k x chunk) dan mengembalikan band yang dihaluskan per blok.
+
+        Jika features terpasang, spektrum daya yang sama juga diteruskan ke ekstraktor fitur
+        (end_sample: jumlah sampel stream di akhir blok terakhir, untuk waktu onset).
+        """
+        start = time.thread_time()
+        blocks = np.atleast_2d(blocks)
+        power = self.power_spectrum(blocks)
+        energies = self.band_energies(blocks, power)
+        if self.features is not None:
+            self.features.process_batch(blocks, power, end_sample)
+
+        # Smoothing attack/decay berurutan agar hasil sama dengan analisis per blok
+        out = np.empty_like(energies, dtype=np.float32)
+        for i, bands in enumerate(energies):
+            rate = np.where(bands > self.smoothed, self.attack, self.decay)
+            self.smoothed += rate * (bands - self.smoothed)
+            out[i] = self.smoothed
+
+        self.last_cpu_ms = (time.thread_time() - start) * 1000.0
+        self.total_cpu_ms += self.last_cpu_ms
+        self.analyses += len(blocks)
+        return out
+
+    def analyze(self, samples):
+        """
+        Menganalisis satu blok sampel dan mengembalikan band yang dihaluskan.
+        """
+        if len(samples) < self.chunk:
+            # Blok terakhir dari file bisa lebih pendek: isi nol di depan
+            samples = np.concatenate([np.zeros(self.chunk - len(samples), dtype=samples.dtype), samples])
+        return self.analyze_batch(samples[np.newaxis, -self.chunk:])[0]
+
+    def stats(self):
+        """
+        Mengembalikan biaya CPU analisis untuk pemantauan.
+        """
+        return {
+            "last_cpu_ms": self.last_cpu_ms,
+            "avg_cpu_ms_per_block": self.total_cpu_ms / self.analyses if self.analyses else 0.0,
+            "blocks": self.analyses,
+        }
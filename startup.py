@@ -0,0 +1,95 @@
+import contextlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from logger import get_logger
+
+log = get_logger("startup")
+
+
+class StartupReport:
+    """
+    Menjalankan inisialisasi komponen secara paralel dan mencatat waktu setiap langkahnya.
+
+    Setiap komponen adalah fungsi tanpa argumen yang mencatat langkahnya sendiri
+    (misalnya import, init, warm-up) lewat step(); laporan akhir memecah biaya per
+    komponen dan membandingkan waktu total dengan jumlah waktu seandainya serial.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.steps = []  # (komponen, langkah, durasi dalam detik)
+        self.components = {}  # Komponen -> durasi total (detik)
+        self.wall = 0.0  # Waktu dinding seluruh inisialisasi paralel
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def step(self, component, name):
+        """
+        Mengukur satu langkah inisialisasi: with report.step("tracker", "import"): ...
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.steps.append((component, name, time.perf_counter() - start))
+
+    def wait_for(self, component):
+        """
+        Menunggu hasil komponen lain (untuk komponen yang bergantung pada komponen lain).
+        """
+        return self._futures[component].result()
+
+    def _timed(self, component, init):
+        start = time.perf_counter()
+        try:
+            return init()
+        finally:
+            self.components[component] = time.perf_counter() - start
+
+    def run_parallel(self, tasks):
+        """
+        Menjalankan semua fungsi inisialisasi ({nama: fungsi}) bersamaan.
+
+        Mengembalikan (hasil, error): dict nama -> objek untuk yang berhasil, dan nama -> exception.
+        """
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, len(tasks)), thread_name_prefix="startup") as pool:
+            for component, init in tasks.items():
+                self._futures[component] = pool.submit(self._timed, component, init)
+            results, errors = {}, {}
+            for component, future in self._futures.items():
+                try:
+                    results[component] = future.result()
+                except Exception as e:
+                    errors[component] = e
+        self.wall = time.perf_counter() - start
+        return results, errors
+
+    def summary(self):
+        """
+        Ringkasan dalam milidetik: total per komponen, rincian langkah, waktu dinding, dan jumlah serial.
+        """
+        components = {}
+        for component, total in self.components.items():
+            components[component] = {"total_ms": total * 1000.0, "steps": {}}
+        for component, name, duration in self.steps:
+            components.setdefault(component, {"total_ms": 0.0, "steps": {}})["steps"][name] = duration * 1000.0
+        return {
+            "components": components,
+            "parallel_ms": self.wall * 1000.0,
+            "serial_ms": sum(self.components.values()) * 1000.0,
+            "since_start_ms": (time.perf_counter() - self.start) * 1000.0,
+        }
+
+    def log_summary(self):
+        summary = self.summary()
+        for component, stats in sorted(summary["components"].items(), key=lambda item: -item[1]["total_ms"]):
+            steps = ", ".join(f"{name} {ms:.0f}" for name, ms in stats["steps"].items())
+            log.info("{component:<11} {total:7.0f} ms  ({steps})", component=component,
+                     total=stats["total_ms"], steps=steps or "-")
+        log.info("Inisialisasi paralel {parallel:.0f} ms (serial {serial:.0f} ms), siap {ready:.0f} ms sejak mulai",
+                 parallel=summary["parallel_ms"], serial=summary["serial_ms"], ready=summary["since_start_ms"])
+        return summary
@@ -0,0 +1,295 @@
+import multiprocessing as mp
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from hand_state import HandState
+from recording import FRAME_DTYPE, fill_frame_row, hands_data_from_row
+
+# Status worker di slot memori bersama
+STARTING, RUNNING, ENDED, FAILED = 0, 1, 2, 3
+STATUS_NAMES = {STARTING: "mulai", RUNNING: "berjalan", ENDED: "selesai", FAILED: "gagal"}
+
+# Satu slot per worker: hasil tracking terakhir plus statistik kesehatan
+SLOT_DTYPE = np.dtype([
+    ("seq", "<u8"),  # Nomor urut hasil terakhir (0 = belum ada)
+    ("frame", FRAME_DTYPE),  # Landmark dan fitur; frame["t"] adalah waktu capture (perf_counter)
+    ("started", "<f8"),  # Waktu perf_counter frame pertama
+    ("heartbeat", "<f8"),  # Waktu perf_counter terakhir worker masih hidup
+    ("frames", "<u8"),  # Jumlah frame yang diproses
+    ("fps", "<f4"),  # Frame/detik (dihaluskan)
+    ("status", "u1"),
+])
+
+
+def parse_source_spec(spec, default_port="visualDj 1"):
+    """
+    Mengurai spesifikasi sumber "SUMBER[,PORT[,CHANNEL]]".
+
+    SUMBER berupa indeks kamera atau path/URL video, misalnya "0", "1,visualDj 2" atau "clip.mp4,visualDj 1,3".
+    """
+    parts = spec.split(",")
+    source = parts[0].strip()
+    return {
+        "source": int(source) if source.isdigit() else source,
+        "port": parts[1].strip() if len(parts) > 1 and parts[1].strip() else default_port,
+        "channel": int(parts[2]) if len(parts) > 2 else 0,
+    }
+
+
+def _worker_main(index, source, shm_name, num_slots, lock, stop_event, data_ready, tracker_kwargs, camera_kwargs):
+    """
+    Proses worker: capture + HandTracker untuk satu sumber, hasilnya ditulis ke slot memori bersama.
+    """
+    # Diimpor di dalam proses worker agar proses supervisor tidak memuat MediaPipe
+    from camera import CameraCapture
+    from hand_tracking import HandTracker
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    slot = np.ndarray((num_slots,), dtype=SLOT_DTYPE, buffer=shm.buf)[index]
+    cap = None
+    try:
+        try:
+            # Thread grabber yang sama dengan pipeline: selalu frame terbaru, pengaturan kamera dari opsi
+            cap = CameraCapture(source, **camera_kwargs)
+        except RuntimeError as e:
+            print(f"Worker {index}: {e}")
+            slot["status"] = FAILED
+            return
+        cap.grab()  # Frame pertama agar auto-exposure mulai berjalan
+        hand_tracker = HandTracker(**tracker_kwargs)
+        hand_tracker.warm_up()  # Inferensi pertama tidak jatuh di frame pertama setelah status RUNNING
+        slot["status"] = RUNNING
+
+        last = slot["started"] = time.perf_counter()
+        while not stop_event.is_set():
+            frame, timestamp = cap.read_latest(timeout=0.5)
+            if frame is None:
+                if cap.isOpened():
+                    continue  # Timeout: periksa stop_event lalu tunggu lagi
+                slot["status"] = ENDED
+                break
+            hands_data = hand_tracker.track_hands(frame)
+
+            now = time.perf_counter()
+            with lock:
+                fill_frame_row(slot["frame"], timestamp, hands_data)
+                slot["seq"] += 1
+                slot["frames"] += 1
+                slot["fps"] += 0.1 * (1.0 / max(now - last, 1e-6) - slot["fps"])
+                slot["heartbeat"] = now
+            last = now
+            data_ready.set()
+    except Exception as e:
+        print(f"Worker {index} berhenti karena error: {e}")
+        slot["status"] = FAILED
+    finally:
+        if cap is not None:
+            cap.release()
+        data_ready.set()  # Bangunkan supervisor agar status baru segera terbaca
+        del slot
+        shm.close()
+
+
+class Supervisor:
+    """
+    Menjalankan satu proses HandTracker per sumber kamera/video dan merutekan hasilnya ke MIDI.
+
+    Setiap worker punya GIL sendiri, sehingga throughput naik mengikuti jumlah core.
+    Landmark dikirim lewat slot memori bersama (bukan pickle); proses utama hanya membaca
+    slot dan menjalankan MidiController per sumber (port dan channel masing-masing).
+    """
+
+    def __init__(self, sources, tracker_kwargs=None, camera_kwargs=None, stats_interval=5.0, heartbeat_timeout=5.0, max_restarts=3,
+                 instrumentation=None, verbose=True, mappings=None):
+        self.sources = sources  # Daftar dict {"source", "port", "channel"} (opsional "outport")
+        self.tracker_kwargs = tracker_kwargs or {}  # Argumen HandTracker untuk setiap worker
+        self.camera_kwargs = camera_kwargs or {}  # Argumen CameraCapture untuk setiap worker (resolusi, fps, ...)
+        self.stats_interval = stats_interval  # Jeda antar laporan kesehatan (detik)
+        self.heartbeat_timeout = heartbeat_timeout  # Worker dianggap macet jika tidak ada hasil selama ini
+        self.max_restarts = max_restarts  # Batas restart otomatis per worker
+        self.instrumentation = instrumentation  # Pencatat latensi capture -> CC (opsional)
+        self.verbose = verbose  # Cetak laporan kesehatan berkala
+        self.mappings = mappings  # Pemetaan gestur bawaan; sumber boleh punya "mappings" sendiri
+
+        # "spawn" di semua platform: aman untuk MediaPipe dan sama dengan perilaku Windows
+        self._ctx = mp.get_context("spawn")
+        self._stop_event = self._ctx.Event()
+        self._data_ready = self._ctx.Event()
+        self._locks = [self._ctx.Lock() for _ in sources]
+        self._processes = [None] * len(sources)
+        self.restarts = [0] * len(sources)
+        self._last_seq = [0] * len(sources)
+        self._states = [HandState() for _ in sources]  # HandState per worker, diisi ulang dari slot
+        self._shm = None
+        self.slots = None
+        self.midi_controllers = []
+        self.final_stats = None  # Statistik terakhir, disimpan saat stop()
+
+    def _open_midi(self):
+        # Sumber dengan nama port yang sama berbagi satu port (channel boleh berbeda)
+        from midi_control import MidiController
+
+        ports = {}
+        for config in self.sources:
+            outport = config.get("outport") or ports.get(config["port"])
+            controller = MidiController(port_name=config["port"], outport=outport, channel=config["channel"],
+                                        mappings=config.get("mappings", self.mappings))
+            ports.setdefault(config["port"], controller.outport)
+            if self.instrumentation is not None:
+                controller.engine.on_send = self.instrumentation.on_midi_send
+            self.midi_controllers.append(controller)
+
+    def _terminate(self, index):
+        # Worker yang dihentikan paksa bisa mati sambil memegang kunci slotnya; kunci diganti baru
+        # agar poll() tidak menunggu selamanya. Slot mungkin setengah tertulis, tapi seq belum naik.
+        self._processes[index].terminate()
+        self._processes[index].join(1.0)
+        self._locks[index] = self._ctx.Lock()
+
+    def _spawn(self, index):
+        self.slots[index]["status"] = STARTING
+        self.slots[index]["heartbeat"] = time.perf_counter()
+        process = self._ctx.Process(
+            target=_worker_main, name=f"tracker-{index}", daemon=True,
+            args=(index, self.sources[index]["source"], self._shm.name, len(self.sources), self._locks[index],
+                  self._stop_event, self._data_ready, self.tracker_kwargs, self.camera_kwargs))
+        process.start()
+        self._processes[index] = process
+
+    def start(self):
+        """
+        Membuka port MIDI, membuat memori bersama, lalu menjalankan semua worker.
+        """
+        self._open_midi()
+        self._shm = shared_memory.SharedMemory(create=True, size=SLOT_DTYPE.itemsize * len(self.sources))
+        self.slots = np.ndarray((len(self.sources),), dtype=SLOT_DTYPE, buffer=self._shm.buf)
+        self.slots[:] = 0
+        for index in range(len(self.sources)):
+            self._spawn(index)
+
+    def poll(self, timeout=0.1):
+        """
+        Menunggu hasil baru dari worker mana pun lalu mengirimkannya ke MIDI.
+
+        Mengembalikan jumlah hasil baru yang diproses.
+        """
+        if not self._data_ready.wait(timeout):
+            return 0
+        self._data_ready.clear()
+        processed = 0
+        for index, slot in enumerate(self.slots):
+            with self._locks[index]:
+                if slot["seq"] == self._last_seq[index]:
+                    continue
+                self._last_seq[index] = int(slot["seq"])
+                row = slot["frame"].copy()  # Salin agar worker bisa langsung menulis lagi
+            hands_data = hands_data_from_row(row, self._states[index])
+            self.midi_controllers[index].send_midi_signals(hands_data, float(row["t"]))
+            processed += 1
+        return processed
+
+    def check_health(self):
+        """
+        Me-restart worker yang mati atau macet (sampai max_restarts). Mengembalikan True jika masih ada worker aktif.
+        """
+        now = time.perf_counter()
+        active = False
+        for index, process in enumerate(self._processes):
+            status = self.slots[index]["status"]
+            if status == ENDED:
+                continue
+            # Worker yang masih memuat MediaPipe (STARTING) belum dianggap macet
+            stalled = status == RUNNING and now - self.slots[index]["heartbeat"] > self.heartbeat_timeout
+            if process.is_alive() and not stalled:
+                active = True
+                continue
+            if self.restarts[index] >= self.max_restarts:
+                if process.is_alive():
+                    self._terminate(index)
+                continue
+            print(f"Worker {index} ({STATUS_NAMES[status]}, macet={stalled}) di-restart.")
+            if process.is_alive():
+                self._terminate(index)
+            process.join(1.0)
+            self.restarts[index] += 1
+            self._spawn(index)
+            active = True
+        return active
+
+    def stats(self):
+        """
+        Statistik per worker: sumber, port/channel MIDI, status, frame, fps, umur heartbeat, dan restart.
+        """
+        now = time.perf_counter()
+        result = []
+        for index, config in enumerate(self.sources):
+            slot = self.slots[index]
+            active = float(slot["heartbeat"] - slot["started"]) if slot["frames"] else 0.0
+            result.append({
+                "source": config["source"],
+                "port": self.midi_controllers[index].outport.name,
+                "channel": config["channel"],
+                "status": STATUS_NAMES[int(slot["status"])],
+                "alive": self._processes[index].is_alive(),
+                "frames": int(slot["frames"]),
+                "fps": float(slot["fps"]),
+                "avg_fps": slot["frames"] / active if active > 0 else 0.0,
+                "heartbeat_age_s": now - float(slot["heartbeat"]),
+                "restarts": self.restarts[index],
+            })
+        return result
+
+    def print_stats(self):
+        for index, stats in enumerate(self.stats()):
+            print(f"Worker {index} [{stats['source']} -> {stats['port']} ch{stats['channel']}] {stats['status']}: "
+                  f"{stats['frames']} frame, {stats['fps']:.1f} frame/s, restart {stats['restarts']}")
+
+    def run(self):
+        """
+        Menjalankan supervisor sampai Ctrl+C atau semua worker selesai/gagal.
+        """
+        self.start()
+        last_report = time.perf_counter()
+        try:
+            while True:
+                self.poll()
+                now = time.perf_counter()
+                if now - last_report >= self.stats_interval:
+                    last_report = now
+                    if self.verbose:
+                        self.print_stats()
+                    if not self.check_health():
+                        break
+                elif not any(process.is_alive() for process in self._processes) and not self.check_health():
+                    break
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self, join_timeout=2.0):
+        """
+        Menghentikan semua worker lalu menutup port MIDI dan memori bersama.
+        """
+        self._stop_event.set()
+        for index, process in enumerate(self._processes):
+            if process is None:
+                continue
+            process.join(join_timeout)
+            if process.is_alive():
+                self._terminate(index)
+        if self.slots is not None:
+            self.poll(0)  # Kirim hasil terakhir yang belum terbaca
+            self.final_stats = self.stats()
+            if self.verbose:
+                self.print_stats()
+        for controller in self.midi_controllers:
+            controller.close()
+        self.midi_controllers = []
+        if self.instrumentation is not None:
+            self.instrumentation.dump()
+        if self._shm is not None:
+            self.slots = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
@@ -0,0 +1,84 @@
+from collections import OrderedDict
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+
+class TextRenderer:
+    """
+    Penggambar teks dengan cache sprite.
+
+    Font dimuat sekali per ukuran, setiap string dirasterisasi sekali menjadi mask alpha
+    dan disimpan dalam cache LRU. Saat menggambar, mask hanya dicampur (alpha blend)
+    ke ROI frame tanpa konversi seluruh frame ke PIL.
+    """
+
+    def __init__(self, font_path, cache_size=256):
+        self.font_path = font_path  # Path ke file font
+        self.cache_size = cache_size  # Jumlah sprite maksimum di cache
+        self._fonts = {}  # Font yang sudah dimuat per ukuran
+        self._sprites = OrderedDict()  # Cache LRU: (teks, ukuran) -> (offset_x, offset_y, mask)
+        self.hits = 0
+        self.misses = 0
+
+    def get_font(self, font_size):
+        """
+        Mengambil font untuk ukuran tertentu, memuatnya hanya pada pemakaian pertama.
+        """
+        font = self._fonts.get(font_size)
+        if font is None:
+            try:
+                font = ImageFont.truetype(self.font_path, font_size)
+            except IOError:
+                print(f"Font '{self.font_path}' tidak ditemukan. Menggunakan font default.")
+                font = ImageFont.load_default()
+            self._fonts[font_size] = font
+        return font
+
+    def get_sprite(self, text, font_size):
+        """
+        Mengambil mask alpha untuk teks dari cache, atau merasterisasinya jika belum ada.
+        """
+        key = (text, font_size)
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self._sprites.move_to_end(key)
+            self.hits += 1
+            return sprite
+
+        self.misses += 1
+        font = self.get_font(font_size)
+        left, top, right, bottom = font.getbbox(text)
+        width, height = max(1, right - left), max(1, bottom - top)
+
+        # Rasterisasi teks sekali ke mask grayscale seukuran kotak pembatasnya
+        mask_img = Image.new("L", (width, height), 0)
+        ImageDraw.Draw(mask_img).text((-left, -top), text, font=font, fill=255)
+        mask = np.asarray(mask_img, dtype=np.uint16)[:, :, np.newaxis]
+
+        sprite = (left, top, mask)
+        self._sprites[key] = sprite
+        if len(self._sprites) > self.cache_size:
+            self._sprites.popitem(last=False)  # Buang sprite yang paling lama tidak dipakai
+        return sprite
+
+    def draw(self, frame, text, position, font_size=24, color=(255, 255, 255)):
+        """
+        Menggambar teks ke frame BGR pada posisi yang sama dengan ImageDraw.text.
+
+        Warna diberikan dalam urutan RGB seperti pada PIL.
+        """
+        left, top, mask = self.get_sprite(text, font_size)
+        x, y = position[0] + left, position[1] + top
+        h, w = mask.shape[:2]
+
+        # Potong sprite agar tetap di dalam batas frame
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, frame.shape[1]), min(y + h, frame.shape[0])
+        if x0 >= x1 or y0 >= y1:
+            return
+        alpha = mask[y0 - y:y1 - y, x0 - x:x1 - x]
+
+        # Alpha blend hanya pada ROI (integer, dibulatkan)
+        roi = frame[y0:y1, x0:x1]
+        bgr = np.array(color[::-1], dtype=np.uint16)
+        roi[:] = (roi * (255 - alpha) + bgr * alpha + 127) // 255
@@ -1,24 +1,16 @@
 import os
 import numpy as np
-from pyaudio import PyAudio, paInt16
-import cv2
-from PIL import Image, ImageDraw, ImageFont
+from text_renderer import TextRenderer
+from overlay import OverlayRenderer
+from hand_state import INDEX_FINGER_TIP, THUMB_TIP, as_hand_state
 
 # Menentukan backend OpenGL untuk visualisasi
 os.environ['VISPY_GL_BACKEND'] = 'PyQt5'
 
 class Visualizer:
     def __init__(self):
-        # Konfigurasi audio
-        self.CHUNK = 1024  # Ukuran buffer, semakin besar semakin banyak data yang diproses
-        self.FORMAT = paInt16  # Format data audio
-        self.CHANNELS = 1  # Audio mono
-        self.RATE = 44100  # Frekuensi sampel audio (Hz)
-
-        # Inisialisasi PyAudio untuk menangani stream audio
-        self.p = PyAudio()
-        self.stream = None
-        self.init_audio_stream()
+        # Data spektrum diambil dari AudioCapture (satu-satunya stream audio),
+        # sehingga Visualizer tidak lagi membuka stream sendiri
 
         # Konfigurasi visualisasi
         self.NUM_BARS = 10  # Jumlah bar dalam visualisasi spektrum
@@ -31,111 +23,61 @@ class Visualizer:
         self.FONT_PATH = "Poppins-Regular.ttf"  # Path ke file font
         self.FONT_SIZE = 18  # Ukuran font untuk teks
 
-    def init_audio_stream(self):
-        """
-        Inisialisasi stream audio dengan memilih perangkat input (Stereo Mix atau perangkat default).
-        """
-        try:
-            # Coba cari perangkat Stereo Mix
-            device_index = None
-            for i in range(self.p.get_device_count()):
-                device_info = self.p.get_device_info_by_index(i)
-                if "Stereo Mix" in device_info["name"]:
-                    print(f"Stereo Mix ditemukan pada device index {i}.")
-                    device_index = i
-                    break
-
-            # Jika Stereo Mix tidak ditemukan, gunakan perangkat input default
-            if device_index is None:
-                print("Stereo Mix tidak ditemukan. Menggunakan perangkat input default.")
-                device_index = self.p.get_default_input_device_info()["index"]
-
-            # Buka stream audio dengan perangkat yang ditemukan
-            self.stream = self.p.open(
-                format=self.FORMAT,
-                channels=self.CHANNELS,
-                rate=self.RATE,
-                input=True,
-                frames_per_buffer=self.CHUNK,
-                input_device_index=device_index
-            )
-            print("Stream audio berhasil dibuka.")
-
-        except Exception as e:
-            print(f"Error saat membuka stream audio: {e}")
-            self.stream = None
-
-    def update_spectrum(self):
-        """
-        Menghitung FFT dari data audio untuk mendapatkan spektrum frekuensi.
+        # Penggambar teks dengan font yang dimuat sekali dan cache sprite
+        self.text_renderer = TextRenderer(self.FONT_PATH)
+
+        # Penggambar overlay berbasis batch untuk garis, lingkaran, kerangka tangan, dan spektrum
+        self.overlay = OverlayRenderer()
+        self._bar_index = None  # Cache indeks band -> bar jika jumlahnya berbeda
+
+        # Elemen yang digambar; dimatikan bertahap oleh QualityGovernor saat frame melewati anggaran
+        self.draw_labels = True  # Label teks Vol/Filter
+        self.draw_spectrum = True  # Spektrum audio di antara kedua tangan
+        self.draw_landmarks = True  # Kerangka tangan, lingkaran ujung jari, dan garis ibu jari-telunjuk
+
+    def draw_visuals(self, frame, hands_data, volume, filter_level, audio_data=None, label_hands=(0, 1)):
         """
-        try:
-            if self.stream is None:
-                print("Stream audio tidak tersedia.")
-                return np.zeros(self.NUM_BARS)
+        Menggambar elemen-elemen visual pada frame dari kamera.
 
-            # Membaca data audio dari stream
-            data = self.stream.read(self.CHUNK, exception_on_overflow=False)
-            audio_data = np.frombuffer(data, dtype=np.int16)
+        label_hands berisi indeks tangan tempat label Vol dan Filter digambar (None = tidak digambar),
+        biasanya dari GestureMapper.labels() agar label mengikuti tangan dan nilai yang dikirim ke MIDI.
 
-            # Menghitung FFT (Fast Fourier Transform) untuk mendapatkan spektrum frekuensi
-            fft_data = np.abs(np.fft.fft(audio_data))[:self.CHUNK // 2]
-            normalized_fft = fft_data / np.max(fft_data) if np.max(fft_data) > 0 else np.zeros_like(fft_data)
+        Semua garis dan lingkaran dikumpulkan ke overlay lalu digambar sekali per warna;
+        teks digambar terakhir di atas overlay.
+        """
+        self.overlay.begin(frame)
 
-            # Menyesuaikan ukuran spektrum dengan jumlah bar
-            x_original = np.linspace(0, 1, len(normalized_fft))
-            x_new = np.linspace(0, 1, self.NUM_BARS)
-            resized_fft = np.interp(x_new, x_original, normalized_fft)
+        # Semua posisi dibaca langsung dari array HandState (tanpa dict per tangan)
+        state = as_hand_state(hands_data)
+        pixels = state.pixels[:state.count]
+        thumbs = pixels[:, THUMB_TIP]
+        indexes = pixels[:, INDEX_FINGER_TIP]
+        lines = (thumbs + indexes) // 2  # Titik tengah garis antara ibu jari dan telunjuk
 
-            return resized_fft
+        # Kerangka tangan (sebelumnya digambar oleh HandTracker)
+        for i in range(state.count if self.draw_landmarks else 0):
+            self.overlay.add_hand_skeleton(pixels[i])
 
-        except Exception as e:
-            print(f"Error saat memperbarui spektrum: {e}")
-            return np.zeros(self.NUM_BARS)
+        labels = []  # Teks (isi, posisi) yang digambar setelah overlay
+        text_offset = 35  # Jarak teks dari telunjuk
+        for text, value, i in (("Vol", volume, label_hands[0]), ("Filter", filter_level, label_hands[1])):
+            if i is None or i >= state.count or value is None:
+                continue
+            # Posisi teks di atas telunjuk; label kedua pada tangan yang sama digeser ke atas
+            offset = text_offset + sum(1 for _, hand in labels if hand == i) * (self.FONT_SIZE + 4)
+            labels.append(((f"{text}: {int(value)}", (int(indexes[i, 0]), int(indexes[i, 1]) - offset)), i))
 
-    def draw_visuals(self, frame, hands_data, volume, filter_level, speed, audio_data=None):
-        """
-        Menggambar elemen-elemen visual pada frame dari kamera.
-        """
-        height, width = frame.shape[:2]
-
-        # Menggambar elemen visual untuk setiap tangan
-        lines = []  # Menyimpan titik-titik tengah garis antara ibu jari dan telunjuk
-        for i, hand in enumerate(hands_data):
-            thumb = hand["thumb"]
-            index = hand["index"]
-
-            # Gambar lingkaran pada ibu jari dan telunjuk
-            self.draw_stroke_circle(frame, thumb, 10, (0, 0, 255), thickness=1)  # Merah pada ibu jari
-            self.draw_stroke_circle(frame, index, 10, (0, 255, 255), thickness=1)  # Kuning pada telunjuk
-
-            # Gambar garis antara ibu jari dan telunjuk
-            self.draw_smooth_line(frame, thumb, index, (255, 255, 255), thickness=3)
-
-            # Menyimpan titik tengah garis antara ibu jari dan telunjuk
-            mid_x = (thumb[0] + index[0]) // 2
-            mid_y = (thumb[1] + index[1]) // 2
-            lines.append((mid_x, mid_y))
-
-            # Posisi teks di atas telunjuk
-            text_offset = 35  # Jarak teks dari telunjuk
-            position = (index[0], index[1] - text_offset)
-            if i == 0:  # Tangan kanan untuk volume
-                text = f"Vol: {int(volume)}"
-            elif i == 1:  # Tangan kiri untuk filter
-                text = f"Filter: {int(filter_level)}"
-
-            # Gambar teks dengan font Poppins
-            self.draw_text_with_poppins(frame, text, position, font_size=self.FONT_SIZE, color=self.TEXT_COLOR)
+        if state.count and self.draw_landmarks:
+            # Lingkaran pada ibu jari dan telunjuk, garis di antaranya (sekali panggil untuk semua tangan)
+            self.overlay.add_circles(thumbs, 10, (0, 0, 255), thickness=1)  # Merah pada ibu jari
+            self.overlay.add_circles(indexes, 10, (0, 255, 255), thickness=1)  # Kuning pada telunjuk
+            self.overlay.add_segments(thumbs, indexes, (255, 255, 255), thickness=3)
 
         # Menggambar spektrum jika ada dua tangan
-        if len(lines) == 2 and audio_data is not None:
+        if len(lines) == 2 and audio_data is not None and self.draw_spectrum:
             # Titik tengah garis antara ibu jari dan telunjuk di kedua tangan
-            line1_mid = lines[0]
-            line2_mid = lines[1]
-
-            # Menghitung jarak antara kedua garis untuk menentukan lebar spektrum
-            distance = self.calculate_distance(line1_mid, line2_mid)
+            line1_mid = lines[0].tolist()
+            line2_mid = lines[1].tolist()
 
             # Menentukan posisi spektrum berdasarkan jarak tangan
             x_start = min(line1_mid[0], line2_mid[0])
@@ -149,78 +91,48 @@ class Visualizer:
             # Gambar spektrum responsif yang bergerak mengikuti tangan
             self.draw_responsive_spectrum(frame, mid_x, mid_y, spectrum_width, audio_data, volume)
 
-        return frame
-
-    def calculate_distance(self, point1, point2):
-        """
-        Menghitung jarak Euclidean antara dua titik.
-        """
-        return ((point1[0] - point2[0])**2 + (point1[1] - point2[1])**2)**0.5
+        # Gambar overlay sekali untuk seluruh geometri
+        self.overlay.composite(frame)
 
-    def draw_stroke_circle(self, frame, center, radius, color, thickness=2):
-        """
-        Menggambar lingkaran dengan garis tepi tanpa isi.
-        """
-        cv2.circle(frame, center, radius, color, thickness=thickness, lineType=cv2.LINE_AA)
+        # Gambar teks dengan font Poppins
+        for (text, position), _ in labels if self.draw_labels else ():
+            self.draw_text_with_poppins(frame, text, position, font_size=self.FONT_SIZE, color=self.TEXT_COLOR)
 
-    def draw_smooth_line(self, frame, start, end, color, thickness=2):
-        """
-        Menggambar garis dengan anti-aliasing agar lebih halus.
-        """
-        cv2.line(frame, start, end, color, thickness=thickness, lineType=cv2.LINE_AA)
+        return frame
 
     def draw_text_with_poppins(self, frame, text, position, font_size=24, color=(255, 255, 255)):
         """
-        Menggambar teks dengan font Poppins dan memberikan efek stroke hitam tipis di sekelilingnya.
-        """
-        x, y = position
-        img_pil = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-        draw = ImageDraw.Draw(img_pil)
-
-        try:
-            font = ImageFont.truetype(self.FONT_PATH, font_size)
-        except IOError:
-            print(f"Font '{self.FONT_PATH}' tidak ditemukan. Menggunakan font default.")
-            font = ImageFont.load_default()
+        Menggambar teks dengan font Poppins.
 
-        draw.text((x, y), text, font=font, fill=color)
-
-        frame[:] = cv2.cvtColor(np.array(img_pil), cv2.COLOR_RGB2BGR)
+        Sprite teks diambil dari cache dan hanya dicampur ke area teks, bukan seluruh frame.
+        """
+        self.text_renderer.draw(frame, text, position, font_size=font_size, color=color)
 
     def draw_responsive_spectrum(self, frame, x_center, y_center, spectrum_width, audio_data, volume):
         """
-        Menggambar spektrum audio yang menyusut atau melebar sesuai dengan jarak antara kedua tangan.
+        Menambahkan spektrum audio yang menyusut atau melebar sesuai dengan jarak antara kedua tangan.
+
+        Data audio sudah ternormalisasi 0-1 oleh SpectrumAnalyzer, sehingga semua bar
+        langsung dihitung sebagai array dan digambar lewat overlay dalam satu batch.
         """
-        max_height = int(self.SPECTRUM_HEIGHT * (volume / 100))  # Tinggi spektrum berdasarkan volume
+        # Tinggi spektrum berdasarkan volume (tinggi penuh jika tidak ada pemetaan volume)
+        max_height = int(self.SPECTRUM_HEIGHT * ((100 if volume is None else volume) / 100))
         total_width = spectrum_width
         x_start = x_center - total_width // 2
 
         if audio_data is None or len(audio_data) == 0:
             audio_data = np.zeros(self.NUM_BARS)  # Nilai default jika audio_data kosong
+        elif len(audio_data) != self.NUM_BARS:
+            # Jumlah band berbeda dengan jumlah bar: ambil band terdekat (indeks di-cache)
+            if self._bar_index is None or self._bar_index[0] != len(audio_data):
+                self._bar_index = (len(audio_data), np.linspace(0, len(audio_data) - 1, self.NUM_BARS).round().astype(int))
+            audio_data = np.asarray(audio_data)[self._bar_index[1]]
 
-        # Normalisasi data audio
-        normalized_audio = audio_data / np.max(audio_data) if np.max(audio_data) > 0 else np.zeros_like(audio_data)
-
-        # Gambar spektrum
-        for i in range(self.NUM_BARS):
-            x_bar = x_start + i * (total_width // self.NUM_BARS)
-            bar_height = int(normalized_audio[i] * max_height)
-            y_top_up = y_center - bar_height  # Posisi atas
-            y_bottom_down = y_center + bar_height  # Posisi bawah
-
-            # Pastikan koordinat tidak negatif atau melebihi batas gambar
-            y_top_up = max(0, y_top_up)
-            y_bottom_down = min(frame.shape[0], y_bottom_down)
-
-            # Gambar garis spektrum
-            cv2.line(frame, (int(x_bar), int(y_center)), (int(x_bar), int(y_top_up)), self.LINE_COLOR, thickness=self.BAR_WIDTH, lineType=cv2.LINE_AA)
-            cv2.line(frame, (int(x_bar), int(y_center)), (int(x_bar), int(y_bottom_down)), self.LINE_COLOR, thickness=self.BAR_WIDTH, lineType=cv2.LINE_AA)
+        heights = (np.clip(audio_data, 0.0, 1.0) * max_height).astype(np.int32)
+        self.overlay.add_spectrum(x_start, total_width, y_center, heights, self.LINE_COLOR, self.BAR_WIDTH, frame.shape[0])
 
     def close(self):
         """
-        Menutup stream audio dan mengosongkan resource.
+        Mengosongkan resource. Stream audio dimiliki dan ditutup oleh AudioCapture.
         """
-        if self.stream:
-            self.stream.stop_stream()
-            self.stream.close()
-            self.p.terminate()
\ No newline at end of file
+        pass
\ No newline at end of file